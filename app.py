@@ -4,12 +4,19 @@ import json
 from pathlib import Path
 
 # 第三方库
-from pyrogram import idle,Client
+from pyrogram import idle
 
 # 自定义模块
 from config.config import API_HASH, API_ID, BOT_TOKEN, PT_GROUP_ID, proxy_set
+from libs.custom_client import Client
+from libs.delete_scheduler import delete_scheduler
 from libs.log import logger
+from libs.raid_cooldown import raid_cooldown
+from libs.notify import notify_bus
+from libs.shutdown import shutdown_coordinator
+from libs.startup import StartupError, StartupOrchestrator, db_ready, gate_until_ready
 from libs.sys_info import system_version_get
+from libs.tmdb_cache import tmdb_cache
 from models import create_all, async_engine
 from models.alter_tables import alter_columns
 from schedulers import scheduler, start_scheduler
@@ -24,48 +31,10 @@ else:
     proxy = None
 
 
-async def start_app():
-    db_flag_path = Path("db_file/dbflag/dbflag.json")
-    db_flag_path.parent.mkdir(parents=True, exist_ok=True)
-    workdir_path = Path("sessions")
-    workdir_path.mkdir(parents=True, exist_ok=True)
-
-    global user_app, bot_app
-
-    user_app = Client(
-        "user_account",
-        api_id=API_ID,
-        api_hash=API_HASH,
-        workdir=str(workdir_path.resolve()),
-        proxy=proxy,
-        plugins=dict(root="user_scripts"),
-    )
-    bot_app = Client(
-        "bot_account",
-        api_id=API_ID,
-        api_hash=API_HASH,
-        bot_token=BOT_TOKEN,
-        workdir=str(workdir_path.resolve()),
-        proxy=proxy,
-        plugins=dict(root="bot_scripts"),
-    )
-
-    project_name, tgbot_sate = await system_version_get()
-    logger.info(f"开始尝试启动 {project_name} 监听程序")
-
-    try:
-        await user_app.start()
-    except Exception as e:
-        logger.critical("user_app 启动失败: %s", e)
-        return
-    try:
-        from bot_scripts.setup import setup_commands
-
-        await bot_app.start()
-        await setup_commands()
-    except Exception as e:
-        logger.critical("bot_app 启动失败: %s", e)
-        return
+async def init_database(db_flag_path: Path):
+    """
+    首次运行建表，之后检查并创建新增数据表，按 dbflag.json 执行字段变更
+    """
     db_flag_data: dict = None
     if os.path.exists(db_flag_path):
         try:
@@ -85,7 +54,8 @@ async def start_app():
                 ensure_ascii=False,
             )
     else:
-        logger.info("数据库已初始化，跳过初始化。")
+        logger.info("数据库已初始化，检查并创建新增数据表。")
+        await create_all()
 
     if db_flag_data and db_flag_data.get("alter_tables") == True:
         await alter_columns()
@@ -97,10 +67,86 @@ async def start_app():
                 indent=4,
                 ensure_ascii=False,
             )
+    # 数据库就绪后才放行插件处理器
+    db_ready.set()
+
 
+async def start_jobs():
     # 启动任务调度和保活任务
     scheduler.start()
     await start_scheduler()
+
+
+async def stop_started(startup: StartupOrchestrator):
+    """
+    启动失败时停止已完成的阶段：调度器、延迟删除队列和已登录的账号
+    """
+    # 未启动的删除队列不能 stop，否则会用空队列覆盖上次保存的待删除消息
+    if "delete_queue" in startup.results:
+        shutdown_coordinator.add_flusher("delete_queue", delete_scheduler.stop)
+    started = [client for name, client in (("user_app", user_app), ("bot_app", bot_app)) if name in startup.results]
+    await shutdown_coordinator.shutdown(started, scheduler)
+    # 登录中途被取消的账号只断开连接
+    for client in (user_app, bot_app):
+        if client not in started and client.is_connected:
+            try:
+                await client.disconnect()
+            except Exception as e:
+                logger.error(f"{client.name} 断开连接失败: {e}")
+    await async_engine.dispose()
+
+
+async def start_app():
+    db_flag_path = Path("db_file/dbflag/dbflag.json")
+    db_flag_path.parent.mkdir(parents=True, exist_ok=True)
+    workdir_path = Path("sessions")
+    workdir_path.mkdir(parents=True, exist_ok=True)
+
+    global user_app, bot_app
+
+    user_app = Client(
+        "user_account",
+        api_id=API_ID,
+        api_hash=API_HASH,
+        workdir=str(workdir_path.resolve()),
+        proxy=proxy,
+        plugins=dict(root="user_scripts"),
+    )
+    bot_app = Client(
+        "bot_account",
+        api_id=API_ID,
+        api_hash=API_HASH,
+        bot_token=BOT_TOKEN,
+        workdir=str(workdir_path.resolve()),
+        proxy=proxy,
+        plugins=dict(root="bot_scripts"),
+    )
+    gate_until_ready(user_app)
+    gate_until_ready(bot_app)
+
+    from bot_scripts.setup import setup_commands
+
+    logger.info("开始尝试启动监听程序")
+    # 两个账号登录与数据库初始化互不依赖，并发进行
+    startup = StartupOrchestrator()
+    startup.add("version", system_version_get)
+    startup.add("user_app", user_app.start)
+    startup.add("bot_app", bot_app.start)
+    startup.add("database", lambda: init_database(db_flag_path))
+    startup.add("bot_commands", setup_commands, deps=("bot_app",), required=False)
+    # 朱雀打劫冷却从最近一条打劫记录恢复
+    startup.add("raid_cooldown", lambda: raid_cooldown.seed("zhuque"), deps=("database",), required=False)
+    # 恢复上次未完成的延迟删除
+    startup.add("delete_queue", lambda: delete_scheduler.start(user_app, bot_app), deps=("user_app", "bot_app"))
+    startup.add("scheduler", start_jobs, deps=("user_app", "bot_app", "database"))
+    try:
+        await startup.run()
+    except StartupError as e:
+        logger.critical(str(e))
+        await stop_started(startup)
+        return
+
+    project_name, tgbot_sate = startup.results["version"]
     logger.info(f"{project_name} 监听程序启动成功")
 
     # 发送版本信息
@@ -108,8 +154,12 @@ async def start_app():
     await bot_app.send_message(PT_GROUP_ID["BOT_MESSAGE_CHAT"], re_msg)
     await idle()  # 等待直到退出
     logger.info(f"开始关闭 {project_name} 监听程序...")
+    # 停止接收新消息并等待进行中的处理器，之后刷新待发送通知和待删除队列，bot 最后停止
+    shutdown_coordinator.add_flusher("notify", notify_bus.flush)
+    shutdown_coordinator.add_flusher("delete_queue", delete_scheduler.stop)
+    shutdown_coordinator.add_flusher("tmdb_cache", tmdb_cache.save)
+    await shutdown_coordinator.shutdown([user_app, bot_app], scheduler)
     await async_engine.dispose()
-    await user_app.stop()
     logger.info(f"{project_name} 监听程序关闭完成")
 
 
@@ -45,6 +45,7 @@ async def help_message(client: Client, message: Message):
             "删除不监听关键字 “不良人",
         ),
         ("/dyjk on/off", "115群电影监控 打开 / 关闭", "/dyjk on", "监听打开"),
+        ("/embyindex on/off", "115群监听,Emby媒体库索引定时同步打开/关闭", "/embyindex on", "打开"),
         ("/dyzf on/off", "CMSbot转发群消息打开/关闭", "/dyzf on", "转发打开"),
         (
             "autochangename on/off",
@@ -60,6 +61,11 @@ async def help_message(client: Client, message: Message):
         ),
         ("/jupai", "回复的文字消息或/jupai 文字 ", "/jupai 你好", "将‘你好’ 转为jupai"),
         ("/xjj", "小姐姐视频", "/xjj", "/"),
+        ("/dbbackup", "立即备份数据库并发送备份文件", "/dbbackup", "/"),
+        ("/delstats", "查看延迟删除队列待删除数量及批量删除统计", "/delstats", "/"),
+        ("/lotterystats", "查看小菜自动抽奖各站点参与及中奖次数", "/lotterystats", "/"),
+        ("/apistats", "查看各优先级API请求排队、等待时间及FloodWait统计", "/apistats", "/"),
+        ("/plugins site on/off", "启用/停用站点插件，重启后生效", "/plugins zhuque off", "停用朱雀插件，不带参数查看状态"),
         ("/backuplist", "获取当前已有数据库备份清单", "/backuplist", "/"),
         (
             "/dbrestore num",
@@ -11,13 +11,16 @@ from pyrogram.types import (
     InlineQuery,
     LinkPreviewOptions,
 )
-import numpy as np
 
 # 自定义模块
+from libs.lazy_import import lazy_import
 from libs.ydx_betmodel import test
 from models.ydx_db_modle import Zhuqueydx
 
 
+np = lazy_import("numpy")
+
+
 async def calculate_ydx_results(count):
     data = await Zhuqueydx.get_data(website="zhuque", limit=count + 40)
     _data = np.array(data, dtype=int)
@@ -66,6 +66,10 @@ BOT_COMMANDS: list[tuple[BotCommand, list[CommandScope]]] = [
         BotCommand("lotterytime", "小菜自动参与抽奖时间段"),
         [CommandScope.PRIVATE_CHATS],
     ),
+    (
+        BotCommand("lotterystats", "小菜自动抽奖各站点参与及中奖统计"),
+        [CommandScope.PRIVATE_CHATS],
+    ),
     (
         BotCommand("autochangename", "自动修改报时昵称"),
         [CommandScope.PRIVATE_CHATS],
@@ -118,6 +122,30 @@ BOT_COMMANDS: list[tuple[BotCommand, list[CommandScope]]] = [
         BotCommand("export", "数据库导出文件"),
         [CommandScope.PRIVATE_CHATS],
     ),
+    (
+        BotCommand("delstats", "查看延迟删除队列状态"),
+        [CommandScope.PRIVATE_CHATS],
+    ),
+    (
+        BotCommand("apistats", "查看API请求调度状态"),
+        [CommandScope.PRIVATE_CHATS],
+    ),
+    (
+        BotCommand("dbbackup", "立即备份数据库"),
+        [CommandScope.PRIVATE_CHATS],
+    ),
+    (
+        BotCommand("archive", "旧数据定时归档开关"),
+        [CommandScope.PRIVATE_CHATS],
+    ),
+    (
+        BotCommand("plugins", "站点插件启用/停用"),
+        [CommandScope.PRIVATE_CHATS],
+    ),
+    (
+        BotCommand("embyindex", "share115tocms Emby媒体库索引定时同步开关"),
+        [CommandScope.PRIVATE_CHATS],
+    ),
     (
         BotCommand("scheduler_jobs", "查询定时任务"),
         [CommandScope.PRIVATE_CHATS],
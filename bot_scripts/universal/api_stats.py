@@ -0,0 +1,137 @@
+# 第三方库
+from pyrogram import filters, Client
+from pyrogram.types import Message
+
+# 自定义模块
+from app import get_user_app, get_bot_app
+from config.config import MY_TGID
+from libs import others
+from libs.emby_index import emby_index
+from libs.flood_budget import send_budget
+from libs.health import health_supervisor
+from libs.notify import notify_bus
+from libs.seen_index import seen_index
+from libs.tmdb_cache import tmdb_cache
+from libs.work_queue import share115_queue
+
+
+PRIORITY_NAMES = {"critical": "高优先", "normal": "普通", "bulk": "批量"}
+
+
+def format_invoke_stats(name: str, app: Client) -> str:
+    scheduler = getattr(app, "invoke_scheduler", None)
+    if scheduler is None:
+        return f"{name}: 未启用调度"
+    stats = scheduler.stats()
+    lines = [f"{name}: 占用 {stats['active']}/{stats['max_pool']}"]
+    for priority, item in stats["priorities"].items():
+        lines.append(
+            f"  {PRIORITY_NAMES[priority]}: 排队 {item['queued']} 调用 {item['count']} "
+            f"平均等待 {item['wait_avg'] * 1000:.0f}ms 最大 {item['wait_max'] * 1000:.0f}ms"
+        )
+    if stats["flood_waits"]:
+        flood = ", ".join(f"{m}×{c}" for m, c in stats["flood_waits"].items())
+        lines.append(f"  FloodWait: {flood}")
+    for method, seconds in stats["blocked"].items():
+        lines.append(f"  {method} 剩余等待 {seconds:.0f} 秒")
+    return "\n".join(lines)
+
+
+def format_budget_stats() -> str:
+    items = send_budget.stats()
+    if not items:
+        return "发送预算: 未触发限速"
+    lines = ["发送预算:"]
+    for item in items:
+        line = (
+            f"  {item['key']}: {item['rate_per_min']:.1f}/{item['default_per_min']:.0f} 条/分 "
+            f"FloodWait {item['floods']} 次"
+        )
+        if item["blocked"]:
+            line += f" 剩余等待 {item['blocked']:.0f} 秒"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def format_notify_stats() -> str:
+    stats = notify_bus.stats()
+    line = f"通知: 收到 {stats['received']} 条 实际发送 {stats['sent']} 条"
+    if stats["pending"]:
+        line += "\n  待合并: " + ", ".join(f"{k}×{v}" for k, v in stats["pending"].items())
+    return line
+
+
+def format_health_stats() -> str:
+    lines = ["网络健康:"]
+    for name, item in health_supervisor.stats().items():
+        line = (
+            f"  {name}: 最近 {item['window_errors']}/{item['window_total']} 次出错 "
+            f"累计 {item['errors']}/{item['total']} 近期重连 {item['reconnects']} 次"
+        )
+        if item["last_error"]:
+            line += f"\n    最近错误: {item['last_error']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def format_tmdb_stats() -> str:
+    stats = tmdb_cache.stats()
+    return (
+        f"TMDB 缓存: {stats['entries']} 条 命中 {stats['hits']} 合并 {stats['coalesced']} "
+        f"请求 {stats['misses']} 命中率 {stats['hit_rate']:.0%}"
+    )
+
+
+def format_emby_index_stats() -> str:
+    stats = emby_index.stats()
+    if not stats["synced_at"]:
+        return "Emby 索引: 未同步"
+    entries = " ".join(f"{media_type} {count}" for media_type, count in stats["entries"].items())
+    return (
+        f"Emby 索引: {entries} 命中 {stats['hits']} 未命中 {stats['misses']}\n"
+        f"  上次同步: {stats['synced_at'][:19]}"
+    )
+
+
+def format_seen_index_stats() -> str:
+    stats = seen_index.stats()
+    return (
+        f"115 去重: {stats['entries']} 条 检查 {stats['checked']} 跳过 {stats['skipped']} "
+        f"节省 {stats['saved_rate']:.0%} 查表 {stats['db_lookups']} 误判 {stats['false_positives']}"
+    )
+
+
+def format_queue_stats() -> str:
+    stats = share115_queue.stats()
+    lines = [
+        f"115 处理队列: 排队 {stats['depth']}/{stats['maxsize']} 峰值 {stats['max_depth']} "
+        f"最长等待 {stats['wait_max']:.1f}s",
+        f"  提交 {stats['submitted']} 完成 {stats['done']} 失败 {stats['failed']} "
+        f"丢弃 {stats['dropped']} 合并 {stats['coalesced']} 重试 {stats['retries']}",
+    ]
+    for stage, item in stats["stages"].items():
+        lines.append(f"  {stage}: 执行 {item['active']}/{item['limit']} 等待 {item['waiting']}")
+    return "\n".join(lines)
+
+
+@Client.on_message(filters.chat(MY_TGID) & filters.command("apistats"))
+async def api_stats(client: Client, message: Message):
+    """
+    API 请求调度状态
+    """
+    re_mess = "\n\n".join(
+        [
+            format_invoke_stats("user_app", get_user_app()),
+            format_invoke_stats("bot_app", get_bot_app()),
+            format_budget_stats(),
+            format_notify_stats(),
+            format_health_stats(),
+            format_tmdb_stats(),
+            format_emby_index_stats(),
+            format_seen_index_stats(),
+            format_queue_stats(),
+        ]
+    )
+    reply = await message.reply(f"```\n{re_mess}\n```")
+    await others.delete_message(reply, 60)
+    await others.delete_message(message, 60)
@@ -22,6 +22,7 @@ MESSAGE = "基础设置"
 
 class Basic(Method):
     auto_restart = (auto(), "自动重启", "toggle")
+    backup_local_only = (auto(), "备份仅本地保存", "toggle")
 
 
 inline_button = InlineButton(SITE_NAME, ACTION, MESSAGE)
@@ -33,6 +34,9 @@ async def main_keyboard():
             [
                 await inline_button.create_button(Basic.auto_restart),
             ],
+            [
+                await inline_button.create_button(Basic.backup_local_only),
+            ],
             [inline_button.close_button()],
         ]
     )
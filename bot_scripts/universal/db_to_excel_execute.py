@@ -11,7 +11,7 @@ from libs import others
 from libs.state import state_manager
 from models.db_to_excel import export_table_to_file
 from models.redpocket_db_modle import Redpocket
-from models.transform_db_modle import User, Raiding, Transform 
+from models.transform_db_modle import User, Raiding, Transform
 from models.ydx_db_modle import Zhuqueydx
 
 
@@ -20,8 +20,9 @@ from models.ydx_db_modle import Zhuqueydx
 async def db_to_excel_execute(client: Client, message: Message):
     action = "csv"
     valid_keyword = { "ydx", "user", "trans", "dajie", "hongbao"}
-    valid_action = {"excel", "csv"}
-     
+    valid_action = {"excel", "csv", "parquet"}
+    valid_option = {"start", "end", "site"}
+
     dbtable_maps = {
         "ydx": Zhuqueydx,
         "user": User,
@@ -32,32 +33,51 @@ async def db_to_excel_execute(client: Client, message: Message):
     if len(message.command) < 2:
         await message.reply(
             f"❌ 参数不足。\n用法："
-            f"\n/export [ydx | user | trans | dajie | hongbao] [excel | csv] (可选) "
+            f"\n/export [ydx | user | trans | dajie | hongbao] [excel | csv | parquet] (可选) "
+            f"\n可选过滤：start=2025-01-01 end=2025-01-31 site=zhuque gz(压缩)"
         )
         return
     keyword = message.command[1].lower()
-    if len(message.command) == 3:
-        action = message.command[2].lower()
-        if action not in valid_action:
-            await message.reply("❌ 参数非法。\n有效选项：`on` `off`")
+    options = {}
+    compress = False
+    for arg in message.command[2:]:
+        if arg.lower() in valid_action:
+            action = arg.lower()
+        elif arg.lower() == "gz":
+            compress = True
+        elif "=" in arg and arg.split("=", 1)[0].lower() in valid_option:
+            key, value = arg.split("=", 1)
+            options[key.lower()] = value
+        else:
+            await message.reply(
+                f"❌ 参数非法：`{arg}`\n有效选项：`excel` `csv` `parquet` `gz` "
+                f"`start=YYYY-MM-DD` `end=YYYY-MM-DD` `site=站点名`"
+            )
             return
-    
-    
+
+
 
       # 命令名是否合法
     if keyword not in valid_keyword:
         site_list = ', '.join(sorted(valid_keyword))
         await message.reply(f"❌ 参数非法。\n有效设置对象：`{site_list}`")
-        return  
-    
-    
-    dbtable = dbtable_maps.get(keyword)
-
-    file_path = await export_table_to_file(dbtable, action)
-    await message.reply_document(file_path)
+        return
 
-    Path(file_path).unlink()     
 
+    dbtable = dbtable_maps.get(keyword)
 
+    try:
+        file_path = await export_table_to_file(
+            dbtable,
+            action,
+            start_date=options.get("start"),
+            end_date=options.get("end"),
+            website=options.get("site"),
+            compress=compress,
+        )
+    except ValueError as e:
+        await message.reply(f"❌ 导出失败：{e}")
+        return
+    await message.reply_document(file_path)
 
-    
+    Path(file_path).unlink()
@@ -0,0 +1,29 @@
+# 第三方库
+from pyrogram import filters, Client
+from pyrogram.types import Message
+
+# 自定义模块
+from config.config import MY_TGID
+from libs import others
+from libs.delete_scheduler import delete_scheduler
+
+
+@Client.on_message(filters.chat(MY_TGID) & filters.command("delstats"))
+async def delete_queue_stats(client: Client, message: Message):
+    """
+    延迟删除队列状态
+    """
+    stats = delete_scheduler.stats()
+    top_chats = sorted(stats["per_chat"].items(), key=lambda x: x[1], reverse=True)[:5]
+    chat_text = "\n".join(f"  {chat_id}: {count}" for chat_id, count in top_chats) or "  无"
+    next_due = f"{stats['next_due']:.0f} 秒后" if stats["next_due"] is not None else "无"
+    re_mess = (
+        f"🗑️ 延迟删除队列\n\n"
+        f"待删除: {stats['pending']}\n"
+        f"最近到期: {next_due}\n"
+        f"待删除最多的会话:\n{chat_text}\n\n"
+        f"已删除: {stats['deleted']}  批次: {stats['batches']}  失败: {stats['failed']}"
+    )
+    reply = await message.reply(re_mess)
+    await others.delete_message(reply, 30)
+    await others.delete_message(message, 30)
@@ -8,6 +8,8 @@ from pyrogram.types import Message
 # 自定义模块
 from config.config import MY_TGID
 from libs import others
+from libs.lottery_parser import lottery_windows
+from libs.lottery_tracker import lottery_tracker
 from libs.state import state_manager
 
 
@@ -105,7 +107,29 @@ async def lottery_time(client: Client, message: Message):
     sorted_pairs = sorted(raw_pairs, key=lambda x: x[0])
     
     state_manager.set_section("LOTTERY", {"lotterytime": sorted_pairs})
+    lottery_windows.update(sorted_pairs)
 
     # 美化展示
     pretty_pairs = "\n".join([f"{s} ~ {e}" for s, e in sorted_pairs])
-    await message.reply(f"✅ 自动参与抽奖时间段已设定：\n{pretty_pairs}")
\ No newline at end of file
+    await message.reply(f"✅ 自动参与抽奖时间段已设定：\n{pretty_pairs}")
+
+
+@Client.on_message(filters.chat(MY_TGID) & filters.command("lotterystats"))
+async def lottery_stats(client: Client, message: Message):
+
+    """
+    小菜自动抽奖各站点参与及中奖次数
+    用法：/lotterystats
+    """
+    stats = await lottery_tracker.stats()
+    if not stats:
+        re_mess = "暂无自动抽奖记录"
+    else:
+        lines = [f"{'站点':<10}{'跟踪':>6}{'参与':>6}{'中奖':>6}"]
+        for website, item in stats.items():
+            lines.append(f"{website.removesuffix('_ID'):<12}{item['tracked']:>8}{item['joined']:>8}{item['won']:>8}")
+        lines.append(f"\n当前跟踪中未开奖: {len(lottery_tracker)} 个")
+        re_mess = "```\n" + "\n".join(lines) + "\n```"
+    reply = await message.reply(re_mess)
+    await others.delete_message(reply, 60)
+    await others.delete_message(message, 60)
\ No newline at end of file
@@ -0,0 +1,36 @@
+# 第三方库
+from pyrogram import filters, Client
+from pyrogram.types import Message
+
+# 自定义模块
+from config.config import MY_TGID
+from libs import others
+from libs.plugin_loader import plugin_sites, site_enabled, site_section
+from libs.state import state_manager
+
+
+@Client.on_message(filters.chat(MY_TGID) & filters.command("plugins"))
+async def plugins_switch(client: Client, message: Message):
+    """
+    站点插件启用/停用，停用的站点启动时不导入其插件
+    用法: /plugins 查看状态  /plugins site on/off
+    """
+    sites = plugin_sites()
+    if len(message.command) == 1:
+        status = "\n".join(f"{'✅' if site_enabled(site) else '⛔'} {site}" for site in sites)
+        reply = await message.reply(f"站点插件状态：\n\n{status}\n\n用法：/plugins site on/off")
+        await others.delete_message(reply, 30)
+        return
+
+    if len(message.command) < 3 or message.command[2] not in ("on", "off"):
+        await message.reply("❌ 参数错误。\n用法：/plugins site on/off")
+        return
+
+    site = message.command[1].lower()
+    action = message.command[2]
+    if site not in sites:
+        await message.reply(f"❌ 参数非法。\n有效站点：`{', '.join(sites)}`")
+        return
+
+    state_manager.set_section(site_section(site), {"enable": action})
+    await message.reply(f"`{site}` 站点插件已设定为 {action}，重启后生效")
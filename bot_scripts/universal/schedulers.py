@@ -24,15 +24,15 @@ async def zhuque_fanda_switch(client: Client, message: Message):
         await message.reply(f"当前运行的调度任务有：\n{job_list}")
 
 
-@Client.on_message(filters.chat(MY_TGID) & filters.command(["autofire", "autochangename"]))
+@Client.on_message(filters.chat(MY_TGID) & filters.command(["autofire", "autochangename", "archive", "embyindex"]))
 async def scheduler_switch_handler(client: Client, message: Message):
     """
-    控制调度任务的开关（如自动释放技能、自动更改昵称）。
-    用法: /autofire on|off 或 /autochangename on|off
+    控制调度任务的开关（如自动释放技能、自动更改昵称、旧数据归档、Emby 索引同步）。
+    用法: /autofire on|off 或 /autochangename on|off 或 /archive on|off 或 /embyindex on|off
     """
     user_app = get_user_app()
     if len(message.command) < 2:
-        await message.reply("❌ 参数不足。\n用法：`/autofire on|off` 或 `/autochangename on|off`")
+        await message.reply("❌ 参数不足。\n用法：`/autofire on|off` 或 `/autochangename on|off` 或 `/archive on|off` 或 `/embyindex on|off`")
         return
     command = message.command[0].lstrip('/')
     action = message.command[1].lower()
@@ -5,6 +5,7 @@ from pyrogram.types import Message
 # 自定义模块
 from config.config import MY_TGID
 from libs import others
+from libs.caption_parser import blockword_matcher
 from libs.state import state_manager
 
 
@@ -103,6 +104,7 @@ async def blockyword_add_remove(client: Client, message: Message):
                 blockyword_list.remove(words)  
 
         state_manager.set_section(header, {"blockyword_list": blockyword_list})
+        blockword_matcher.update(blockyword_list)
 
         re_mess=await message.reply(f'屏蔽词{words}{action}成功\n当前当前屏蔽词以下：{blockyword_list}')
     else:
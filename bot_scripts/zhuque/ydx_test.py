@@ -6,8 +6,11 @@ from pyrogram.types import Message
 from config.config import MY_TGID
 from libs import others
 from libs.ydx_betmodel import test
+from libs.lazy_import import lazy_import
 from models.ydx_db_modle import Zhuqueydx
-import numpy as np
+
+
+np = lazy_import("numpy")
 
 
 @Client.on_message(filters.command("ydxtest") & filters.chat(MY_TGID))
@@ -29,5 +32,5 @@ async def zhuque_ydx_switch(client: Client, message: Message):
 
 @Client.on_message(filters.command("ydxclean") & filters.chat(MY_TGID))
 async def ydxclean(client: Client, message: Message):
-    await Zhuqueydx.remove_duplicate_records()
-    await message.reply("清理完成")
+    removed = await Zhuqueydx.remove_duplicate_records()
+    await message.reply(f"清理完成，删除 {removed} 条重复记录")
@@ -0,0 +1,165 @@
+# 标准库
+import re
+import time
+from typing import NamedTuple
+
+# 自定义模块
+from libs.keyword_matcher import AhoCorasick
+from libs.state import state_manager
+
+
+SITE_NAME = "SHARE115TOCMS"
+
+# 标题 (年份)，标题为同一行中括号前的内容
+TITLE_YEAR_PATTERN = re.compile(r"(.*?)\s*\((\d+)\)")
+# 【xxx】标题 (年份)
+BRACKET_TITLE_YEAR_PATTERN = re.compile(r"[】](.*?)\s*\((\d+)\)")
+# 名称: 标题 (年份)
+COLON_TITLE_YEAR_PATTERN = re.compile(r"[:] (.*?)\s*\((\d+)\)")
+# 大小：1.02G
+SIZE_PATTERN = re.compile(r"大\s*小[：:]\s*([\d.]+)\s*([TGM])")
+SIZE_UNITS = {"M": 1, "G": 1024, "T": 1024**2}
+# 不含“第”且超过这个大小（MB）的剧集视为完结
+COMPLETE_SIZE_MB = 10240
+
+
+class MediaInfo(NamedTuple):
+    title: str
+    year: str
+    size_mb: float | None
+    complete: bool
+
+
+def parse_title_year_caption(caption: str) -> MediaInfo | None:
+    """
+    “标题 (年份)” 格式，含“全”且不含“EP”或含“完结”视为完结
+    """
+    match = TITLE_YEAR_PATTERN.search(caption)
+    if not match:
+        return None
+    complete = ("EP" not in caption and "全" in caption) or "完结" in caption
+    return MediaInfo(match.group(1).strip(), match.group(2).strip(), None, complete)
+
+
+def parse_pan115_caption(caption: str) -> MediaInfo | None:
+    """
+    “【分类】标题 (年份)” 或 “名称: 标题 (年份)” 格式，按“大小：”判断是否完结
+    """
+    pattern = BRACKET_TITLE_YEAR_PATTERN if "】" in caption else COLON_TITLE_YEAR_PATTERN
+    match = pattern.search(caption)
+    if not match:
+        return None
+    size_mb = None
+    if size_match := SIZE_PATTERN.search(caption):
+        size_mb = float(size_match.group(1)) * SIZE_UNITS[size_match.group(2)]
+    complete = size_mb is not None and size_mb >= COMPLETE_SIZE_MB and "第" not in caption
+    return MediaInfo(match.group(1).strip(), match.group(2).strip(), size_mb, complete)
+
+
+class BlockwordMatcher:
+    """
+    115 监听屏蔽词匹配
+
+    首次使用时按 state 中的 blockyword_list 构建自动机，之后只在 /blockyword 修改时 update 重建。
+    屏蔽词添加时已转为小写，匹配时标题也转为小写
+    """
+
+    def __init__(self):
+        self._matcher: AhoCorasick | None = None
+
+    def update(self, words: list[str]):
+        self._matcher = AhoCorasick(words)
+
+    def match(self, title: str) -> str | None:
+        if self._matcher is None:
+            self.update(state_manager.get_item(SITE_NAME, "blockyword_list", []))
+        return self._matcher.search(title.lower())
+
+
+blockword_matcher = BlockwordMatcher()
+
+
+# ================== 解析基准 ==================
+FIXTURES = [
+    (parse_title_year_caption, "沙丘2 (2024)\n4K HDR 杜比视界\nhttps://115cdn.com/s/swabc", MediaInfo("沙丘2", "2024", None, False)),
+    (parse_title_year_caption, "繁花 (2023) 全30集 完结\nhttps://115cdn.com/s/swdef", MediaInfo("繁花", "2023", None, True)),
+    (parse_title_year_caption, "庆余年 第二季 (2024) 全36集 EP01-EP36\nhttps://115cdn.com/s/swghi", MediaInfo("庆余年 第二季", "2024", None, False)),
+    (parse_title_year_caption, "Oppenheimer (2023) 全\nhttps://115cdn.com/s/swjkl", MediaInfo("Oppenheimer", "2023", None, True)),
+    (parse_title_year_caption, "无年份的分享\nhttps://115cdn.com/s/swmno", None),
+    (parse_pan115_caption, "【电视剧】漫长的季节 (2023)\n大 小：56.3G\nhttps://115cdn.com/s/swpqr", MediaInfo("漫长的季节", "2023", 56.3 * 1024, True)),
+    (parse_pan115_caption, "【电视剧】长相思 第二季 (2024)\n大 小：20.1G 第1-8集\nhttps://115cdn.com/s/swstu", MediaInfo("长相思 第二季", "2024", 20.1 * 1024, False)),
+    (parse_pan115_caption, "名称: 周处除三害 (2023)\n大小：800M\nhttps://115cdn.com/s/swvwx", MediaInfo("周处除三害", "2023", 800.0, False)),
+    (parse_pan115_caption, "名称: 三体 (2023)\n大小：1.2T\nhttps://115cdn.com/s/swyza", MediaInfo("三体", "2023", 1.2 * 1024**2, True)),
+    (parse_pan115_caption, "【电影】没有年份\nhttps://115cdn.com/s/swbcd", None),
+]
+
+
+def _legacy_parse(parser, caption: str):
+    """原 monitor_channels 中的内联解析，仅用于基准对比"""
+    if parser is parse_title_year_caption:
+        match = re.search(r"(.*?)\s*\((\d+)\)", caption)
+        if match:
+            complete = ("EP" not in caption and "全" in caption) or "完结" in caption
+            return match.group(1).strip(), match.group(2).strip(), complete
+        return None
+    unit_map = {"M": 1, "G": 1024, "T": 1024**2}
+    pattern = r"[】](.*?)\s*\((\d+)\)" if "】" in caption else r"[:] (.*?)\s*\((\d+)\)"
+    title_year_match = re.search(pattern, caption)
+    size_match = re.search(r"大\s*小[：:]\s*([\d.]+)\s*([TGM])", caption)
+    complete = False
+    if size_match:
+        size_mb = float(size_match.group(1)) * unit_map[size_match.group(2)]
+        complete = size_mb >= 10240 and "第" not in caption
+    if title_year_match:
+        return title_year_match.group(1).strip(), title_year_match.group(2).strip(), complete
+    return None
+
+
+def benchmark(rounds: int = 20000, blockwords: int = 200) -> str:
+    """
+    用 FIXTURES 校验解析结果，并对比原内联解析、原屏蔽词线性扫描的耗时
+
+    返回:
+        str: 统计报告
+    """
+    for parser, caption, expected in FIXTURES:
+        result = parser(caption)
+        assert result == expected, f"{caption!r}: {result} != {expected}"
+        legacy = _legacy_parse(parser, caption)
+        assert (legacy is None) == (result is None)
+        if result:
+            assert legacy == (result.title, result.year, result.complete)
+
+    def timeit(func) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for parser, caption, _ in FIXTURES:
+                func(parser, caption)
+        return (time.perf_counter() - start) / (rounds * len(FIXTURES)) * 1e6
+
+    words = [f"屏蔽词{i}" for i in range(blockwords)] + ["第二季"]
+    matcher = AhoCorasick(words)
+    titles = [expected.title for _, _, expected in FIXTURES if expected]
+    for title in titles:
+        assert matcher.search(title) == next((w for w in words if w in title), None)
+
+    def time_block(func) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds // 10):
+            for title in titles:
+                func(title)
+        return (time.perf_counter() - start) / (rounds // 10 * len(titles)) * 1e6
+
+    return "\n".join(
+        [
+            f"解析 {len(FIXTURES)} 条样例 × {rounds} 轮",
+            f"  原内联解析 {timeit(_legacy_parse):.2f}us/条  预编译解析 {timeit(lambda p, c: p(c)):.2f}us/条",
+            f"屏蔽词 {len(words)} 个",
+            f"  线性扫描 {time_block(lambda t: any(w in t for w in words)):.2f}us/条  "
+            f"AC 自动机 {time_block(matcher.search):.2f}us/条",
+        ]
+    )
+
+
+if __name__ == "__main__":
+    print(benchmark())
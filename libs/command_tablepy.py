@@ -3,8 +3,11 @@ import os
 import uuid
 from pathlib import Path
 
-# 第三方库
-import imgkit
+# 自定义模块
+from libs.lazy_import import lazy_import
+
+
+imgkit = lazy_import("imgkit")
 
 
 async def generate_command_table_image(data, title="📘 命令一览表"):
@@ -1,98 +1,272 @@
 # 标准库
 import asyncio
 import sys
-import traceback
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 
 # 第三方库
 from pyrogram import Client as _Client
 from pyrogram.errors import (
     RPCError,
     FloodWait,
+    FloodPremiumWait,
     Unauthorized,
     AuthKeyInvalid,
 )
 
 # 自定义模块
+from libs.flood_budget import SEND_METHODS, peer_id, send_budget
+from libs.health import health_supervisor
 from libs.log import logger
+from libs.plugin_loader import ImportProfile, plugin_modules
 from libs.state import state_manager
 
 
+# 优先级从高到低
+PRIORITIES = ("critical", "normal", "bulk")
+# 延迟敏感：ydx 下注、抢红包、21点 的按钮回调
+CRITICAL_METHODS = {
+    "messages.GetBotCallbackAnswer",
+    "messages.SetBotCallbackAnswer",
+}
+# 批量：历史/搜索扫描、删除、上传下载
+BULK_METHODS = {
+    "messages.GetHistory",
+    "messages.Search",
+    "messages.DeleteMessages",
+    "channels.DeleteMessages",
+    "upload.SaveFilePart",
+    "upload.SaveBigFilePart",
+    "upload.GetFile",
+}
+
+
+def query_name(query) -> str:
+    """raw 请求的方法名，如 messages.GetHistory"""
+    inner = getattr(query, "query", query)
+    return ".".join(inner.QUALNAME.split(".")[1:])
+
+
+def method_priority(method: str) -> str:
+    if method in CRITICAL_METHODS:
+        return "critical"
+    if method in BULK_METHODS:
+        return "bulk"
+    return "normal"
+
+
+class InvokeScheduler:
+    """
+    按优先级分配 max_pool 个并发槽
+
+    - 槽空出时按 critical > normal > bulk 的顺序唤醒等待者
+    - bulk 最多同时占用 bulk_pool 个槽，给延迟敏感请求留出余量
+    - FloodWait 按方法记录解封时间，等待期间不占用槽
+    """
+
+    def __init__(self, max_pool: int = 10, bulk_pool: int | None = None):
+        self.max_pool = max_pool
+        self.bulk_pool = bulk_pool or max(max_pool - 3, 1)
+        self._active = 0
+        self._active_bulk = 0
+        self._waiters = {p: deque() for p in PRIORITIES}
+        self._blocked_until: dict[str, float] = {}
+        self._metrics = {p: {"count": 0, "wait_total": 0.0, "wait_max": 0.0} for p in PRIORITIES}
+        self.flood_waits: dict[str, int] = {}
+
+    def _can_run(self, priority: str) -> bool:
+        if self._active >= self.max_pool:
+            return False
+        return priority != "bulk" or self._active_bulk < self.bulk_pool
+
+    def _take(self, priority: str):
+        self._active += 1
+        if priority == "bulk":
+            self._active_bulk += 1
+
+    def _release(self, priority: str):
+        self._active -= 1
+        if priority == "bulk":
+            self._active_bulk -= 1
+        self._wake()
+
+    def _wake(self):
+        for priority in PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters and self._can_run(priority):
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                self._take(priority)
+                future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, priority: str):
+        """占用一个并发槽"""
+        start = time.monotonic()
+        queued = any(self._waiters[p] for p in PRIORITIES[: PRIORITIES.index(priority) + 1])
+        if queued or not self._can_run(priority):
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[priority].append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                # 已经分到槽但任务被取消，把槽交还
+                if future.done() and not future.cancelled():
+                    self._release(priority)
+                raise
+        else:
+            self._take(priority)
+
+        waited = time.monotonic() - start
+        metrics = self._metrics[priority]
+        metrics["count"] += 1
+        metrics["wait_total"] += waited
+        metrics["wait_max"] = max(metrics["wait_max"], waited)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    async def wait_flood(self, method: str):
+        """方法处于 FloodWait 时在槽外等待"""
+        delay = self._blocked_until.get(method, 0) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def block(self, method: str, seconds: float):
+        until = time.monotonic() + seconds
+        self._blocked_until[method] = max(self._blocked_until.get(method, 0), until)
+        self.flood_waits[method] = self.flood_waits.get(method, 0) + 1
+
+    def stats(self) -> dict:
+        """
+        调度指标：占用槽数、各优先级排队数/调用数/平均与最大等待、各方法 FloodWait 次数及剩余封禁秒数
+        """
+        now = time.monotonic()
+        return {
+            "active": self._active,
+            "max_pool": self.max_pool,
+            "priorities": {
+                p: {
+                    "queued": sum(1 for f in self._waiters[p] if not f.done()),
+                    "count": m["count"],
+                    "wait_avg": m["wait_total"] / m["count"] if m["count"] else 0.0,
+                    "wait_max": m["wait_max"],
+                }
+                for p, m in self._metrics.items()
+            },
+            "flood_waits": dict(self.flood_waits),
+            "blocked": {
+                method: until - now
+                for method, until in self._blocked_until.items()
+                if until > now
+            },
+        }
+
+
 class Client(_Client):
-    async def start(self, *args, invoke_retries: int = 5, max_pool: int = 10, **kargs):
+    def load_plugins(self):
         """
-        重写 start 方法，在会话认证后设置 CustomSession。
+        只加载启用站点的插件，并在启动日志中输出各插件及其依赖的导入耗时
+        """
+        if self.plugins and self.plugins.get("enabled", True) and not self.plugins.get("include"):
+            root = self.plugins["root"]
+            modules, skipped = plugin_modules(root)
+            self.import_profile = ImportProfile()
+            self.import_profile.load(root, modules)
+            self.import_profile.report(self.name, skipped)
+            self.plugins = {**self.plugins, "include": modules}
+        super().load_plugins()
+
+    async def start(
+        self,
+        *args,
+        invoke_retries: int = 5,
+        max_pool: int = 10,
+        bulk_pool: int | None = None,
+        **kargs,
+    ):
+        """
+        重写 start 方法，在会话认证后用 InvokeScheduler 接管 session.invoke。
         """
         await super().start(*args, **kargs)
         self._invoke_retries = invoke_retries
-        self._pool_semaphore = asyncio.Semaphore(max_pool)
+        self.invoke_scheduler = InvokeScheduler(max_pool, bulk_pool)
         self._session_invoke = self.session.invoke
         self.session.invoke = self._custom_invoke
 
     async def _custom_invoke(self, query, *args, **kwargs):
+        method = query_name(query)
+        priority = method_priority(method)
+        scheduler = self.invoke_scheduler
+        # 发送类请求额外按会话预算平滑，FloodWait 只限制该会话
+        budgeted = method in SEND_METHODS
+        chat_id = peer_id(query) if budgeted else None
+        # FloodWait 统一在这里处理，session 内部不再占着槽等待
+        kwargs["sleep_threshold"] = 0
         retries = 0
+        last_error = None
         while retries < self._invoke_retries:
-            async with self._pool_semaphore:
+            await scheduler.wait_flood(method)
+            if budgeted:
+                await send_budget.acquire(self.name, method, chat_id)
+            delay = 0
+            async with scheduler.slot(priority):
                 try:
                     # logger.debug(
-                    #    f"调用 {query.__class__.__name__} (尝试 {retries + 1}/{self._invoke_retries})"
+                    #    f"调用 {method} (尝试 {retries + 1}/{self._invoke_retries})"
                     # )
-                    response = await self._session_invoke(query, *args, **kwargs)
-                    # logger.debug(f"请求 {query.__class__.__name__} 成功")
-                    return response
-                except FloodWait as e:
+                    result = await self._session_invoke(query, *args, **kwargs)
+                    if budgeted:
+                        send_budget.on_success(self.name, method, chat_id)
+                    health_supervisor.record_success(self)
+                    return result
+                except (FloodWait, FloodPremiumWait) as e:
+                    last_error = e
                     wait_time = e.value
-                    logger.warning(
-                        f"FloodWait: 为 {query.__class__.__name__} 等待 {wait_time} 秒"
-                    )
-                    await asyncio.sleep(wait_time)
-                    retries += 1
+                    if budgeted:
+                        send_budget.on_flood(self.name, method, chat_id, wait_time)
+                        scheduler.flood_waits[method] = scheduler.flood_waits.get(method, 0) + 1
+                    else:
+                        logger.warning(f"FloodWait: 为 {method} 等待 {wait_time} 秒")
+                        scheduler.block(method, wait_time)
 
                 except asyncio.TimeoutError as e:
-
-                    await asyncio.sleep(1)
-                    retries += 1
-                    if retries < self._invoke_retries:
+                    last_error = e
+                    delay = 1
+                    health_supervisor.record_error(self, e)
+                    if retries + 1 < self._invoke_retries:
                         logger.warning(
-                            f"TimeoutError for {query.__class__.__name__} 重试第{retries}/{self._invoke_retries}次"
+                            f"TimeoutError for {method} 重试第{retries + 1}/{self._invoke_retries}次"
                         )
                     else:
-                        logger.error(
-                            f"TimeoutError for {query.__class__.__name__}",
-                            exc_info=True,
-                        )
+                        logger.error(f"TimeoutError for {method}", exc_info=True)
 
-                except RPCError as e:
-                    break
-                    await asyncio.sleep(1)
-                    retries += 1
-                    if retries < self._invoke_retries:
-                        logger.warning(
-                            f"RPCError for {query.__class__.__name__} 重试第{retries}/{self._invoke_retries}次"
-                        )
-                    else:
-                        logger.error(
-                            f"RPCError for {query.__class__.__name__}",
-                            exc_info=True,
-                        )
-                    logger.error(
-                        f"RPCError for {query.__class__.__name__}", exc_info=True
-                    )
+                except (Unauthorized, AuthKeyInvalid):
+                    raise
+
+                except RPCError:
+                    # 业务错误交给调用方处理，与未接管时的 pyrogram 行为一致
+                    health_supervisor.record_success(self)
+                    raise
 
                 except Exception as e:
-                    await asyncio.sleep(1)
-                    retries += 1
-                    if retries < self._invoke_retries:
+                    last_error = e
+                    delay = 1
+                    health_supervisor.record_error(self, e)
+                    if retries + 1 < self._invoke_retries:
                         logger.warning(
-                            f"意外错误 for {query.__class__.__name__} 重试第{retries}/{self._invoke_retries}次"
+                            f"意外错误 for {method} 重试第{retries + 1}/{self._invoke_retries}次"
                         )
                     else:
-                        logger.error(
-                            f"意外错误 for {query.__class__.__name__}",
-                            exc_info=True,
-                        )
-        # 超过最大重试次数后，尝试 get_me 判断是否需要重启
-        if (
-            state_manager.get_item("BASIC", "auto_restart", "off") == "on"
-            and retries == self._invoke_retries
-        ):
+                        logger.error(f"意外错误 for {method}", exc_info=True)
+            retries += 1
+            if delay:
+                await asyncio.sleep(delay)
+
+        # 超过最大重试次数后，根据设置退出以便重启
+        if state_manager.get_item("BASIC", "auto_restart", "off") == "on":
             sys.exit(1)
+        raise last_error
@@ -0,0 +1,299 @@
+# 标准库
+import os
+import gzip
+import time
+import shutil
+import sqlite3
+import asyncio
+import tempfile
+from pathlib import Path
+from datetime import datetime
+
+# 第三方库
+from pyrogram.types import Message
+
+# 自定义模块
+from config.config import DB_INFO
+from libs.log import logger
+
+
+# === 配置部分 ===
+BACKUP_DIR = Path("db_file/mysqlBackup")
+SQLITE_DB_PATH = Path("db_file/SQLite/tgbot.db")
+RETENTION_DAYS = 8  # 备份保留天数
+CHUNK_SIZE = 64 * 1024  # 流式读写块大小
+MYSQL_BACKUP_PATTERN = "*.sql.gz"
+SQLITE_BACKUP_PATTERN = "*.db.gz"
+SQLITE_BACKUP_PAGES = 256  # SQLite 在线备份每步复制的页数，每步结束后释放锁，写入不会被长时间阻塞
+SQLITE_BACKUP_SLEEP = 0.05  # 某一步遇到 SQLITE_BUSY / SQLITE_LOCKED 时等待多久再重试（秒）
+SQLITE_BACKUP_MAX_RESTARTS = 3  # 分页复制因写入重新开始超过此次数后改为一次性复制
+
+
+class _BackupRestarted(Exception):
+    """分页复制期间源库被写入的次数过多"""
+
+
+class ProgressReporter:
+    """
+    节流的进度提示，按 interval 秒编辑一次提示消息
+    """
+
+    def __init__(self, message: Message | None, title: str, interval: float = 5):
+        self.message = message
+        self.title = title
+        self.interval = interval
+        self._last = 0.0
+
+    async def __call__(self, done: int, total: int | None = None):
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        text = f"{self.title}\n已处理 {done / 1024 / 1024:.1f} MB"
+        if total:
+            text += f" / {total / 1024 / 1024:.1f} MB ({min(done / total, 1):.0%})"
+        logger.info(text.replace("\n", " "))
+        if self.message:
+            try:
+                await self.message.edit(text)
+            except Exception as e:
+                logger.warning(f"进度消息更新失败: {e}")
+
+
+def mysql_command(program: str, *args: str) -> list[str]:
+    """构造 mysqldump / mysql 命令行"""
+    return [
+        program,
+        *args,
+        "-h", DB_INFO["address"],
+        "-P", str(DB_INFO["port"]),
+        "-u", DB_INFO["user"],
+        f"-p{DB_INFO['password']}",
+        DB_INFO["db_name"],
+    ]
+
+
+async def mysqldump_to_gzip(backup_path: Path, progress=None) -> int:
+    """
+    mysqldump → gzip → 文件 流式备份，不落地未压缩的 .sql
+
+    Args:
+        backup_path: 输出的 .sql.gz 路径
+        progress: 可选进度回调 progress(done_bytes, total_bytes)
+
+    Returns:
+        int: 导出的未压缩字节数
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *mysql_command("mysqldump", "--no-tablespaces", "--single-transaction"),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stderr_task = asyncio.create_task(proc.stderr.read())
+    written = 0
+    try:
+        f_out = await asyncio.to_thread(gzip.open, backup_path, "wb")
+        try:
+            while chunk := await proc.stdout.read(CHUNK_SIZE):
+                await asyncio.to_thread(f_out.write, chunk)
+                written += len(chunk)
+                if progress:
+                    await progress(written)
+        finally:
+            await asyncio.to_thread(f_out.close)
+    finally:
+        # 出错或被取消时结束 mysqldump，并回收进程和 stderr 读取任务
+        if proc.returncode is None and not proc.stdout.at_eof():
+            proc.kill()
+        await proc.wait()
+        stderr = await stderr_task
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.decode(errors="replace"))
+    return written
+
+
+async def gzip_to_mysql(backup_path: Path, progress=None) -> None:
+    """
+    gzip → mysql stdin 流式还原，不在内存或临时文件中展开整个备份
+
+    Args:
+        backup_path: .sql.gz 备份路径
+        progress: 可选进度回调 progress(done_bytes, total_bytes)，按压缩文件计算
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *mysql_command("mysql", "--binary-mode=1"),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout_task = asyncio.create_task(proc.stdout.read())
+    stderr_task = asyncio.create_task(proc.stderr.read())
+    try:
+        total = backup_path.stat().st_size
+        raw = await asyncio.to_thread(open, backup_path, "rb")
+        f_in = gzip.GzipFile(fileobj=raw)
+        try:
+            while chunk := await asyncio.to_thread(f_in.read, CHUNK_SIZE):
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+                if progress:
+                    await progress(raw.tell(), total)
+        except (BrokenPipeError, ConnectionResetError):
+            # mysql 提前退出，错误信息见 stderr
+            pass
+        finally:
+            f_in.close()
+            raw.close()
+    except BaseException:
+        # 备份损坏、读取失败或被取消：先结束 mysql 再关闭 stdin，避免把不完整的备份当作正常结束执行
+        if proc.returncode is None:
+            proc.kill()
+        raise
+    finally:
+        proc.stdin.close()
+        await proc.wait()
+        _, stderr = await asyncio.gather(stdout_task, stderr_task)
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.decode(errors="replace"))
+
+
+def _sqlite_copy(src: sqlite3.Connection, dst: sqlite3.Connection, progress=None, loop=None) -> None:
+    """
+    分页增量复制 SQLite 数据库，每步之间释放锁，运行中的写入不会被阻塞
+
+    其他连接每次写入源库都会让分页复制从头开始，重新开始超过 SQLITE_BACKUP_MAX_RESTARTS 次后
+    改为一步复制全部页面（期间持有读锁），保证写入频繁时也能完成
+    """
+    page_size = src.execute("PRAGMA page_size").fetchone()[0]
+    restarts = 0
+    last_remaining = None
+
+    def on_progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        # 剩余页数变多说明复制已重新开始
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > SQLITE_BACKUP_MAX_RESTARTS:
+                raise _BackupRestarted
+        last_remaining = remaining
+        if progress and loop:
+            asyncio.run_coroutine_threadsafe(
+                progress((total - remaining) * page_size, total * page_size), loop
+            )
+
+    try:
+        src.backup(
+            dst,
+            pages=SQLITE_BACKUP_PAGES,
+            progress=on_progress,
+            sleep=SQLITE_BACKUP_SLEEP,
+        )
+    except _BackupRestarted:
+        logger.warning(f"SQLite 分页备份因写入重新开始 {restarts} 次，改为一次性复制")
+        src.backup(dst, pages=-1)
+
+
+def _sqlite_backup(db_path: Path, backup_path: Path, progress=None, loop=None) -> None:
+    """SQLite 在线备份 API 导出快照后 gzip 压缩（在线程中执行）"""
+    snapshot_path = backup_path.with_suffix("")  # 去掉 .gz
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(snapshot_path)
+    try:
+        _sqlite_copy(src, dst, progress, loop)
+    finally:
+        dst.close()
+        src.close()
+    try:
+        with open(snapshot_path, "rb") as f_in, gzip.open(backup_path, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, CHUNK_SIZE)
+    finally:
+        snapshot_path.unlink(missing_ok=True)
+
+
+def _sqlite_restore(backup_path: Path, db_path: Path, progress=None, loop=None) -> None:
+    """解压 .db.gz 快照后通过在线备份 API 写回数据库（在线程中执行）"""
+    fd, snapshot_name = tempfile.mkstemp(suffix=".db", dir=BACKUP_DIR)
+    snapshot_path = Path(snapshot_name)
+    try:
+        with os.fdopen(fd, "wb") as f_out, gzip.open(backup_path, "rb") as f_in:
+            shutil.copyfileobj(f_in, f_out, CHUNK_SIZE)
+        src = sqlite3.connect(snapshot_path)
+        dst = sqlite3.connect(db_path)
+        try:
+            _sqlite_copy(src, dst, progress, loop)
+        finally:
+            dst.close()
+            src.close()
+    finally:
+        snapshot_path.unlink(missing_ok=True)
+
+
+async def sqlite_backup(backup_path: Path, progress=None, db_path: Path = SQLITE_DB_PATH) -> None:
+    """
+    使用 SQLite 在线备份 API 分页备份数据库，运行中的写入不受影响
+
+    Args:
+        backup_path: 输出的 .db.gz 路径
+        progress: 可选进度回调 progress(done_bytes, total_bytes)
+        db_path: SQLite 数据库路径
+    """
+    loop = asyncio.get_running_loop()
+    await asyncio.to_thread(_sqlite_backup, db_path, backup_path, progress, loop)
+
+
+async def sqlite_restore(backup_path: Path, progress=None, db_path: Path = SQLITE_DB_PATH) -> None:
+    """
+    将 .db.gz 快照通过在线备份 API 还原到 SQLite 数据库
+
+    调用前需停止处理器和定时任务的写入并关闭 async_engine 的连接池，还原后需重启程序
+
+    Args:
+        backup_path: .db.gz 备份路径
+        progress: 可选进度回调 progress(done_bytes, total_bytes)
+        db_path: SQLite 数据库路径
+    """
+    loop = asyncio.get_running_loop()
+    await asyncio.to_thread(_sqlite_restore, backup_path, db_path, progress, loop)
+
+
+def new_backup_path() -> Path:
+    """按当前数据库类型生成带时间戳的备份文件路径"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    if DB_INFO["dbset"] == "mySQL":
+        return BACKUP_DIR / f"{DB_INFO['db_name']}_backup_{timestamp}.sql.gz"
+    return BACKUP_DIR / f"{SQLITE_DB_PATH.stem}_backup_{timestamp}.db.gz"
+
+
+def backup_pattern() -> str:
+    """当前数据库类型对应的备份文件匹配规则"""
+    if DB_INFO["dbset"] == "mySQL":
+        return MYSQL_BACKUP_PATTERN
+    return SQLITE_BACKUP_PATTERN
+
+
+def list_backups(pattern: str = "*.gz") -> list[Path]:
+    """获取所有备份文件（按修改时间倒序）"""
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    return sorted(
+        BACKUP_DIR.glob(pattern), key=lambda f: f.stat().st_mtime, reverse=True
+    )
+
+
+def cleanup_expired_backups(patterns=(MYSQL_BACKUP_PATTERN, SQLITE_BACKUP_PATTERN)) -> list[Path]:
+    """
+    删除超过 RETENTION_DAYS 的备份文件
+
+    Returns:
+        list[Path]: 被删除的文件
+    """
+    now = datetime.now()
+    removed = []
+    for pattern in patterns:
+        for file in BACKUP_DIR.glob(pattern):
+            mtime = datetime.fromtimestamp(file.stat().st_mtime)
+            if (now - mtime).days > RETENTION_DAYS:
+                logger.info(f"🗑️ 删除过期备份: {file}")
+                file.unlink()
+                removed.append(file)
+    return removed
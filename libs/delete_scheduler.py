@@ -0,0 +1,181 @@
+# 标准库
+import json
+import time
+import heapq
+import asyncio
+from pathlib import Path
+
+# 第三方库
+from pyrogram import Client
+from pyrogram.types import Message
+
+# 自定义模块
+from libs.log import logger
+
+
+# 待删除队列的持久化文件，重启后继续删除
+PENDING_DELETE_FILE = Path("db_file/pending_deletes.json")
+# delete_messages 单次最多 100 条
+BATCH_SIZE = 100
+# 到期前这么多秒内的删除一起发出，凑成更大的批次
+COALESCE_SECONDS = 1
+# 队列有变化时最多每隔这么多秒写一次文件
+SAVE_INTERVAL = 5
+# 超过 48 小时的消息 Telegram 已不允许普通用户删除，重启恢复时丢弃
+MAX_AGE = 48 * 3600
+
+
+class DeleteScheduler:
+    """
+    延迟删除调度器
+
+    所有待删除消息放在一个按到期时间排序的堆里，由单个后台任务处理：
+    到期后按 (client, chat) 分组，每组用一次 delete_messages 批量删除
+    """
+
+    def __init__(self, path: Path = PENDING_DELETE_FILE):
+        self.path = path
+        # (到期时间戳, chat_id, message_id, client 名称)
+        self._heap: list[tuple[float, int, int, str]] = []
+        self._clients: dict[str, Client] = {}
+        self._worker: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._dirty = False
+        self._saved_at = 0.0
+        self.deleted = 0
+        self.batches = 0
+        self.failed = 0
+
+    def register_client(self, client: Client):
+        self._clients[client.name] = client
+
+    def schedule(self, message: Message, delay: float):
+        """
+        sleep_time 秒后删除 message
+        """
+        client = message._client
+        self.register_client(client)
+        item = (time.time() + delay, message.chat.id, message.id, client.name)
+        heapq.heappush(self._heap, item)
+        self._dirty = True
+        self._ensure_worker()
+        if self._heap[0] is item:
+            self._wakeup.set()
+
+    async def start(self, *clients: Client):
+        """
+        注册 client 并恢复上次未完成的删除
+        """
+        for client in clients:
+            self.register_client(client)
+        pending = await asyncio.to_thread(self._load)
+        now = time.time()
+        restored = [tuple(item) for item in pending if now - item[0] < MAX_AGE]
+        if restored:
+            self._heap.extend(restored)
+            heapq.heapify(self._heap)
+            logger.info(f"恢复 {len(restored)} 条待删除消息")
+        self._ensure_worker()
+        self._wakeup.set()
+
+    async def stop(self):
+        """停止后台任务并保存未完成的删除"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self._save()
+
+    def stats(self) -> dict:
+        """
+        队列指标：待删除数量、各会话待删除数量、已删除/批次/失败计数、最近到期秒数
+        """
+        per_chat = {}
+        for _, chat_id, _, _ in self._heap:
+            per_chat[chat_id] = per_chat.get(chat_id, 0) + 1
+        return {
+            "pending": len(self._heap),
+            "per_chat": per_chat,
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "failed": self.failed,
+            "next_due": max(self._heap[0][0] - time.time(), 0) if self._heap else None,
+        }
+
+    def _ensure_worker(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            now = time.time()
+            if self._dirty and now - self._saved_at >= SAVE_INTERVAL:
+                await self._save()
+            timeout = self._heap[0][0] - now if self._heap else None
+            if self._dirty:
+                timeout = SAVE_INTERVAL if timeout is None else min(timeout, SAVE_INTERVAL)
+            if timeout is None or timeout > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except TimeoutError:
+                    pass
+                continue
+            await self._delete_due()
+
+    async def _delete_due(self):
+        deadline = time.time() + COALESCE_SECONDS
+        groups: dict[tuple[str, int], list[int]] = {}
+        while self._heap and self._heap[0][0] <= deadline:
+            _, chat_id, message_id, client_name = heapq.heappop(self._heap)
+            groups.setdefault((client_name, chat_id), []).append(message_id)
+        self._dirty = True
+
+        for (client_name, chat_id), message_ids in groups.items():
+            client = self._clients.get(client_name)
+            if client is None:
+                logger.warning(f"删除队列中的 {client_name} 未注册，丢弃 {len(message_ids)} 条")
+                self.failed += len(message_ids)
+                continue
+            for i in range(0, len(message_ids), BATCH_SIZE):
+                batch = message_ids[i : i + BATCH_SIZE]
+                try:
+                    await client.delete_messages(chat_id, batch)
+                    self.deleted += len(batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.warning(f"批量删除 {chat_id} 的 {len(batch)} 条消息失败: {e}")
+                self.batches += 1
+
+    def _load(self) -> list:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取待删除队列失败: {e}")
+            return []
+
+    async def _save(self):
+        data = json.dumps(list(self._heap))
+        self._dirty = False
+        self._saved_at = time.time()
+
+        def write():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(data, encoding="utf-8")
+            tmp_path.replace(self.path)
+
+        try:
+            await asyncio.to_thread(write)
+        except OSError as e:
+            logger.warning(f"保存待删除队列失败: {e}")
+
+
+delete_scheduler = DeleteScheduler()
@@ -0,0 +1,192 @@
+# 标准库
+import json
+import time
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
+
+# 第三方库
+import aiohttp
+from aiohttp import ClientTimeout
+
+# 自定义模块
+from libs.log import logger
+from libs.state import state_manager
+
+
+SITE_NAME = "SHARE115TOCMS"
+EMBY_INDEX_FILE = Path("db_file/emby_index.json")
+# 每页拉取条数
+PAGE_SIZE = 500
+# 距上次全量同步超过这么多秒时做全量同步，用来剔除 Emby 中已删除的条目
+FULL_SYNC_INTERVAL = 24 * 3600
+# Emby 类型 -> TMDB 类型
+EMBY_TYPES = {"Movie": "movie", "Series": "tv"}
+
+
+class EmbyIndex:
+    """
+    Emby 媒体库 ProviderIds 本地索引
+
+    按类型保存库中所有条目的 TMDB ID 以及 IMDB ID，持久化到 EMBY_INDEX_FILE。
+    refresh 只拉取上次同步后新增或修改的条目（MinDateLastSaved），每隔 FULL_SYNC_INTERVAL 做一次全量同步。
+    contains 是纯内存的集合查找，不访问网络
+    """
+
+    def __init__(self, path: Path = EMBY_INDEX_FILE):
+        self.path = path
+        self.tmdb: dict[str, set[str]] = {media_type: set() for media_type in EMBY_TYPES.values()}
+        self.imdb: set[str] = set()
+        # 上次同步开始时间（ISO 格式，作为下次增量同步的起点）
+        self.synced_at: str | None = None
+        self.full_synced_at = 0.0
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Emby 索引读取失败，将重新全量同步: {e}")
+            return
+        for media_type, ids in data.get("tmdb", {}).items():
+            self.tmdb.setdefault(media_type, set()).update(ids)
+        self.imdb.update(data.get("imdb", []))
+        self.synced_at = data.get("synced_at")
+        self.full_synced_at = data.get("full_synced_at", 0.0)
+
+    def _save(self):
+        data = {
+            "tmdb": {media_type: sorted(ids) for media_type, ids in self.tmdb.items()},
+            "imdb": sorted(self.imdb),
+            "synced_at": self.synced_at,
+            "full_synced_at": self.full_synced_at,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    @property
+    def ready(self) -> bool:
+        """至少完成过一次同步"""
+        self._load()
+        return self.synced_at is not None
+
+    def contains(self, media_type: str = None, tmdb_id=None, imdb_id: str = None) -> bool:
+        """
+        媒体库中是否已有该条目
+
+        参数:
+            media_type: "movie" / "tv"，为空时在所有类型中查找
+            tmdb_id: TMDB ID
+            imdb_id: IMDB ID，如 "tt0133093"
+        """
+        self._load()
+        found = False
+        if tmdb_id is not None:
+            tmdb_id = str(tmdb_id)
+            if media_type in self.tmdb:
+                found = tmdb_id in self.tmdb[media_type]
+            else:
+                found = any(tmdb_id in ids for ids in self.tmdb.values())
+        if not found and imdb_id:
+            found = imdb_id in self.imdb
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    def add(self, media_type: str, tmdb_id=None, imdb_id: str = None):
+        """实时查询确认存在的条目补进索引，等下次同步时写入文件"""
+        self._load()
+        if tmdb_id is not None:
+            self.tmdb.setdefault(media_type, set()).add(str(tmdb_id))
+        if imdb_id:
+            self.imdb.add(imdb_id)
+
+    async def _fetch_items(self, session: aiohttp.ClientSession, url: str, params: dict):
+        start = 0
+        while True:
+            async with session.get(url, params={**params, "StartIndex": start}) as response:
+                response.raise_for_status()
+                res = await response.json()
+            items = res.get("Items") or []
+            for item in items:
+                yield item
+            start += len(items)
+            if not items or start >= res.get("TotalRecordCount", 0):
+                return
+
+    async def refresh(self, full: bool = False) -> int:
+        """
+        从 Emby 同步索引
+
+        参数:
+            full: 是否强制全量同步
+
+        返回:
+            int: 本次拉取的条目数
+        """
+        embyserver = state_manager.get_item(SITE_NAME, "embyserver", "")
+        embyapi = state_manager.get_item(SITE_NAME, "embyapi", "")
+        if not embyserver or not embyapi:
+            return 0
+
+        async with self._lock:
+            self._load()
+            full = full or not self.synced_at or time.time() - self.full_synced_at > FULL_SYNC_INTERVAL
+            params = {
+                "IncludeItemTypes": ",".join(EMBY_TYPES),
+                "Fields": "ProviderIds",
+                "Recursive": "true",
+                "Limit": PAGE_SIZE,
+                "api_key": embyapi,
+            }
+            if not full:
+                params["MinDateLastSaved"] = self.synced_at
+            started_at = datetime.now(timezone.utc).isoformat()
+
+            tmdb = {media_type: set() for media_type in EMBY_TYPES.values()}
+            imdb = set()
+            async with aiohttp.ClientSession(timeout=ClientTimeout(total=120)) as session:
+                async for item in self._fetch_items(session, f"{embyserver}emby/Items", params):
+                    provider_ids = {k.lower(): v for k, v in (item.get("ProviderIds") or {}).items()}
+                    media_type = EMBY_TYPES.get(item.get("Type"))
+                    if media_type and provider_ids.get("tmdb"):
+                        tmdb[media_type].add(str(provider_ids["tmdb"]))
+                    if provider_ids.get("imdb"):
+                        imdb.add(provider_ids["imdb"])
+
+            count = sum(len(ids) for ids in tmdb.values())
+            if full:
+                self.tmdb, self.imdb = tmdb, imdb
+                self.full_synced_at = time.time()
+            else:
+                for media_type, ids in tmdb.items():
+                    self.tmdb[media_type].update(ids)
+                self.imdb.update(imdb)
+            self.synced_at = started_at
+            await asyncio.to_thread(self._save)
+            logger.info(f"Emby 索引{'全量' if full else '增量'}同步完成，拉取 {count} 条")
+            return count
+
+    def stats(self) -> dict:
+        self._load()
+        return {
+            "entries": {media_type: len(ids) for media_type, ids in self.tmdb.items()},
+            "synced_at": self.synced_at,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+emby_index = EmbyIndex()
@@ -0,0 +1,205 @@
+# 标准库
+import time
+import asyncio
+
+# 自定义模块
+from libs.log import logger
+
+
+# 计入发送预算的方法
+SEND_METHODS = {
+    "messages.SendMessage",
+    "messages.SendMedia",
+    "messages.SendMultiMedia",
+    "messages.ForwardMessages",
+    "messages.EditMessage",
+}
+# 初始速率（条/秒）与突发容量，会根据 FloodWait 自动下调
+CHAT_RATE = 1.0  # 私聊
+GROUP_RATE = 20 / 60  # 群 / 频道
+METHOD_RATE = 25.0  # 单个方法的账号级总速率
+BURST = 10
+# 被 FloodWait 后速率乘以 DECREASE，之后每次成功向初始速率恢复 RECOVER 的比例
+DECREASE = 0.5
+RECOVER = 0.02
+MIN_RATE = 1 / 120
+
+
+class Bucket:
+    """
+    令牌桶，令牌允许为负：先扣令牌再按欠额计算等待时间，并发请求自然排队
+    """
+
+    def __init__(self, rate: float, burst: float = BURST):
+        self.default_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.floods = 0
+
+    def reserve(self) -> float:
+        """预订一个令牌，返回需要等待的秒数"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(delay, self.blocked_until - now)
+
+    def flood(self, seconds: float):
+        self.floods += 1
+        self.rate = max(self.rate * DECREASE, MIN_RATE)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        # 解封后从空桶开始，避免立刻突发
+        self.tokens = min(self.tokens, 0)
+
+    def success(self):
+        if self.rate < self.default_rate:
+            self.rate = min(self.default_rate, self.rate + (self.default_rate - self.rate) * RECOVER + MIN_RATE)
+
+
+class SendBudget:
+    """
+    发送预算：按 (账号, 会话) 和 (账号, 方法) 两级令牌桶平滑发送
+
+    user_app 与 bot_app 共用一个实例，键中包含账号名，互不影响。
+    每次 FloodWait 会降低对应会话（无会话时为方法）的速率并在等待结束前阻塞，
+    之后随着成功发送逐步恢复，从而学习到 Telegram 对该会话的实际限制
+    """
+
+    def __init__(self):
+        self._chats: dict[tuple[str, int], Bucket] = {}
+        self._methods: dict[tuple[str, str], Bucket] = {}
+
+    def _chat_bucket(self, account: str, chat_id: int) -> Bucket:
+        key = (account, chat_id)
+        if key not in self._chats:
+            rate = GROUP_RATE if chat_id < 0 else CHAT_RATE
+            self._chats[key] = Bucket(rate)
+        return self._chats[key]
+
+    def _method_bucket(self, account: str, method: str) -> Bucket:
+        key = (account, method)
+        if key not in self._methods:
+            self._methods[key] = Bucket(METHOD_RATE, burst=METHOD_RATE)
+        return self._methods[key]
+
+    async def acquire(self, account: str, method: str, chat_id: int | None):
+        """发送前调用，按预算等待"""
+        delay = self._method_bucket(account, method).reserve()
+        if chat_id is not None:
+            delay = max(delay, self._chat_bucket(account, chat_id).reserve())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self, account: str, method: str, chat_id: int | None):
+        self._method_bucket(account, method).success()
+        if chat_id is not None:
+            self._chat_bucket(account, chat_id).success()
+
+    def on_flood(self, account: str, method: str, chat_id: int | None, seconds: float):
+        if chat_id is not None:
+            bucket = self._chat_bucket(account, chat_id)
+        else:
+            bucket = self._method_bucket(account, method)
+        bucket.flood(seconds)
+        logger.warning(
+            f"{account} 发送预算: {method} {chat_id or ''} FloodWait {seconds} 秒，速率降为 {bucket.rate * 60:.1f} 条/分"
+        )
+
+    def stats(self) -> list[dict]:
+        """被限速过的会话/方法及当前学习到的速率"""
+        now = time.monotonic()
+        items = [
+            (f"{account} {chat_id}", bucket) for (account, chat_id), bucket in self._chats.items()
+        ] + [(f"{account} {method}", bucket) for (account, method), bucket in self._methods.items()]
+        return [
+            {
+                "key": key,
+                "rate_per_min": bucket.rate * 60,
+                "default_per_min": bucket.default_rate * 60,
+                "floods": bucket.floods,
+                "blocked": max(bucket.blocked_until - now, 0),
+            }
+            for key, bucket in items
+            if bucket.floods or bucket.rate < bucket.default_rate
+        ]
+
+
+def peer_id(query) -> int | None:
+    """
+    发送类请求的目标会话 id，群/频道返回负数，无法识别时返回 None
+    """
+    peer = getattr(query, "peer", None) or getattr(query, "to_peer", None)
+    if peer is None:
+        return None
+    if hasattr(peer, "channel_id"):
+        return -peer.channel_id
+    if hasattr(peer, "chat_id"):
+        return -peer.chat_id
+    return getattr(peer, "user_id", None)
+
+
+class Digest:
+    """
+    把一段时间内的低优先级通知合并为一条消息发送
+
+    第一条通知到达后等待 window 秒，期间的通知一起发出；
+    累计到 max_items 条时立即发送
+    """
+
+    # Telegram 单条消息长度上限 4096，留出余量
+    MAX_LENGTH = 4000
+
+    def __init__(self, send, title: str, window: float = 300, max_items: int = 20):
+        """
+        参数:
+            send: 发送函数 async send(text)
+            title: 摘要标题
+        """
+        self.send = send
+        self.title = title
+        self.window = window
+        self.max_items = max_items
+        self._items: list[str] = []
+        self._task: asyncio.Task | None = None
+        self._flushing: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        """待发送的通知数"""
+        return len(self._items)
+
+    def add(self, text: str):
+        self._items.append(text)
+        if len(self._items) >= self.max_items:
+            task = asyncio.create_task(self.flush())
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+        elif self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+    async def flush(self):
+        items, self._items = self._items, []
+        if not items:
+            return
+        header = f"{self.title}（{len(items)} 条）"
+        chunks = [header]
+        for item in items:
+            if len(chunks[-1]) + len(item) + 2 > self.MAX_LENGTH:
+                chunks.append(item)
+            else:
+                chunks[-1] += f"\n\n{item}"
+        for chunk in chunks:
+            try:
+                await self.send(chunk)
+            except Exception as e:
+                logger.warning(f"{self.title} 摘要发送失败: {e}")
+
+
+send_budget = SendBudget()
@@ -0,0 +1,144 @@
+# 标准库
+import time
+import asyncio
+from collections import deque
+
+# 自定义模块
+from libs.async_bash import bash
+from libs.log import logger
+from libs.notify import CRITICAL, WARNING, notify
+from libs.state import state_manager
+
+
+# 统计最近 WINDOW 秒内的请求结果
+WINDOW = 60
+# 窗口内至少 MIN_ERRORS 次网络错误且错误率不低于 ERROR_RATE 时重连该账号
+MIN_ERRORS = 5
+ERROR_RATE = 0.5
+# 重连后 COOLDOWN 秒内不再判断，给会话恢复时间
+COOLDOWN = 120
+# RESTART_WINDOW 秒内重连 MAX_RECONNECTS 次仍未恢复时才重启整个进程
+MAX_RECONNECTS = 3
+RESTART_WINDOW = 15 * 60
+RESTART_COMMAND = "supervisorctl restart main"
+
+
+class ClientHealth:
+    def __init__(self):
+        # (时间戳, 是否成功)
+        self.results: deque[tuple[float, bool]] = deque()
+        self.reconnects: deque[float] = deque()
+        self.reconnecting = False
+        self.cooldown_until = 0.0
+        self.total = 0
+        self.errors = 0
+        self.last_error = ""
+
+    def trim(self, now: float):
+        while self.results and now - self.results[0][0] > WINDOW:
+            self.results.popleft()
+        while self.reconnects and now - self.reconnects[0] > RESTART_WINDOW:
+            self.reconnects.popleft()
+
+    def window_errors(self) -> int:
+        return sum(1 for _, ok in self.results if not ok)
+
+
+class HealthSupervisor:
+    """
+    进程内健康监控
+
+    由 custom_client 在每次请求完成后上报结果，不再轮询日志文件。
+    某个账号短时间内网络错误率过高时只重连该账号的会话，
+    多次重连仍不恢复才执行 RESTART_COMMAND 重启整个进程
+    """
+
+    def __init__(self):
+        self._clients: dict[str, ClientHealth] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.restarting = False
+
+    def _health(self, name: str) -> ClientHealth:
+        if name not in self._clients:
+            self._clients[name] = ClientHealth()
+        return self._clients[name]
+
+    def record_success(self, client):
+        health = self._health(client.name)
+        health.total += 1
+        health.results.append((time.monotonic(), True))
+
+    def record_error(self, client, error: BaseException):
+        """记录一次网络层错误（超时、连接断开等），必要时安排重连"""
+        now = time.monotonic()
+        health = self._health(client.name)
+        health.total += 1
+        health.errors += 1
+        health.last_error = str(error) or type(error).__name__
+        health.results.append((now, False))
+        health.trim(now)
+
+        if health.reconnecting or now < health.cooldown_until:
+            return
+        errors = health.window_errors()
+        if errors >= MIN_ERRORS and errors / len(health.results) >= ERROR_RATE:
+            health.reconnecting = True
+            task = asyncio.create_task(self._recover(client, health, errors))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _recover(self, client, health: ClientHealth, errors: int):
+        try:
+            if len(health.reconnects) >= MAX_RECONNECTS:
+                await self._restart(client, health)
+                return
+            logger.warning(
+                f"{client.name} {WINDOW} 秒内 {errors} 次网络错误（{health.last_error}），重连会话"
+            )
+            health.reconnects.append(time.monotonic())
+            try:
+                await client.session.restart()
+            except Exception as e:
+                logger.error(f"{client.name} 重连失败: {e}")
+                await notify(f"{client.name} 重连失败: {e}", level=CRITICAL)
+            else:
+                await notify(
+                    f"{client.name} 网络错误过多（{health.last_error}），已重连会话",
+                    level=WARNING,
+                    topic="health",
+                )
+        finally:
+            health.results.clear()
+            health.cooldown_until = time.monotonic() + COOLDOWN
+            health.reconnecting = False
+
+    async def _restart(self, client, health: ClientHealth):
+        if self.restarting:
+            return
+        self.restarting = True
+        command = state_manager.get_item("BASIC", "restart_command", RESTART_COMMAND)
+        logger.error(
+            f"{client.name} {RESTART_WINDOW // 60} 分钟内重连 {len(health.reconnects)} 次仍未恢复，执行 {command}"
+        )
+        await notify(f"{client.name} 多次重连仍未恢复，重启程序", level=CRITICAL)
+        await bash(command)
+        # 命令执行失败时进程仍在运行，允许之后再次尝试
+        self.restarting = False
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        result = {}
+        for name, health in self._clients.items():
+            health.trim(now)
+            result[name] = {
+                "total": health.total,
+                "errors": health.errors,
+                "window_total": len(health.results),
+                "window_errors": health.window_errors(),
+                "reconnects": len(health.reconnects),
+                "last_error": health.last_error,
+            }
+        return result
+
+
+health_supervisor = HealthSupervisor()
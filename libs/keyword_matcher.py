@@ -0,0 +1,65 @@
+# 标准库
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    多关键字匹配自动机，一次扫描文本即可找出包含的关键字
+    """
+
+    def __init__(self, words):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # 每个节点结束的关键字，包括经失配指针可达的较短关键字
+        self._out: list[tuple[str, ...]] = [()]
+        for word in words:
+            if not word:
+                continue
+            node = 0
+            for ch in word:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            if word not in self._out[node]:
+                self._out[node] += (word,)
+
+        # 按层构造失配指针，节点的输出合并失配节点的输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> str | None:
+        """返回文本中最先匹配到的关键字，没有则为 None"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                return out[node][0]
+        return None
+
+    def findall(self, text: str) -> set[str]:
+        """文本中出现的全部关键字"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            found.update(out[node])
+        return found
@@ -0,0 +1,42 @@
+# 标准库
+import sys
+import importlib.util
+
+
+def lazy_import(name: str):
+    """
+    延迟导入模块，第一次访问属性时才真正执行导入
+
+    用于 pandas、numpy、imgkit 等较重的依赖，未用到相关功能时不拖慢启动。
+    注意模块级的类型注解会立即访问属性，需要写成字符串
+
+    参数:
+        name: 模块名，如 "pandas"
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def ensure_loaded(*names: str):
+    """
+    在当前线程完成延迟导入
+
+    LazyLoader 第一次访问属性时才执行导入，这一过程不是线程安全的。
+    在 asyncio.to_thread 中使用延迟导入的模块前，先在事件循环线程调用一次
+
+    参数:
+        names: 模块名，如 "numpy"
+    """
+    for name in names:
+        if module := sys.modules.get(name):
+            # 访问任意属性即触发真正的导入
+            getattr(module, "__file__", None)
@@ -3,11 +3,12 @@ import os
 import uuid
 from pathlib import Path
 
-# 第三方库
-import imgkit
-
 # 自定义模块
 from config import config
+from libs.lazy_import import lazy_import
+
+
+imgkit = lazy_import("imgkit")
 
 
 medal_emojis = {
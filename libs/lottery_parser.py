@@ -0,0 +1,93 @@
+# 标准库
+import re
+from bisect import bisect_right
+from datetime import time
+
+# 自定义模块
+from libs.keyword_matcher import AhoCorasick
+from libs.log import logger
+from libs.state import state_manager
+
+
+# 新抽奖通知中的各字段，一次扫描全部取出
+ANNOUNCEMENT_PATTERN = re.compile(
+    r"抽奖 ID：(?P<ID>.+)"
+    r"|创建者：(?P<boss_name>\w+)(?:\s+\((?P<boss_ID>\d+)\))?"
+    r"|奖品：\n      ▸ (?P<prize>.+)"
+    r"|允许普通用户参加：(?P<allowuser>.+)"
+    r"|参与关键词：「(?P<keyword>.+)」"
+)
+ANNOUNCEMENT_FIELDS = ("ID", "boss_name", "boss_ID", "prize", "allowuser", "keyword")
+DEFAULT_LOTTERY_TIME = [("08:00", "11:00"), ("13:00", "17:00")]
+
+
+def parse_announcement(text: str) -> dict[str, str]:
+    """
+    解析新抽奖通知，缺少的字段为空字符串，同一字段取第一次出现的值
+    """
+    info = dict.fromkeys(ANNOUNCEMENT_FIELDS, "")
+    for match in ANNOUNCEMENT_PATTERN.finditer(text):
+        for key, value in match.groupdict().items():
+            if value is not None and not info[key]:
+                info[key] = value
+    return info
+
+
+class PrizeMatcher:
+    """
+    奖品名 -> 站点键
+
+    奖品描述中出现多个站点的奖品名时，按 PRIZE_LIST 中站点的先后顺序取第一个
+    """
+
+    def __init__(self, prize_list: dict[str, list[str]]):
+        # 奖品名 -> (站点顺序, 站点键)
+        self._sites: dict[str, tuple[int, str]] = {}
+        for order, (site, prize_names) in enumerate(prize_list.items()):
+            for prize_name in prize_names:
+                self._sites.setdefault(prize_name, (order, site))
+        self._matcher = AhoCorasick(self._sites)
+
+    def classify(self, prize: str) -> str | None:
+        matched = self._matcher.findall(prize)
+        if not matched:
+            return None
+        return min(self._sites[prize_name] for prize_name in matched)[1]
+
+
+class TimeWindows:
+    """
+    自动抽奖时间段
+
+    首次使用时从 state 的 LOTTERY.lotterytime 读取，之后只在 /lotterytime 修改时 update。
+    时间段按开始时间排序并合并重叠部分，判断时二分查找
+    """
+
+    def __init__(self):
+        self._starts: list[time] | None = None
+        self._ends: list[time] = []
+
+    def update(self, pairs):
+        parsed = []
+        for start_str, end_str in pairs:
+            try:
+                parsed.append(sorted((time.fromisoformat(start_str), time.fromisoformat(end_str))))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"自动抽奖时间段 {start_str}~{end_str} 无效: {e}")
+        windows = []
+        for start, end in sorted(parsed):
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end)
+            else:
+                windows.append([start, end])
+        self._starts = [start for start, _ in windows]
+        self._ends = [end for _, end in windows]
+
+    def contains(self, now: time) -> bool:
+        if self._starts is None:
+            self.update(state_manager.get_item("LOTTERY", "lotterytime", DEFAULT_LOTTERY_TIME))
+        i = bisect_right(self._starts, now) - 1
+        return i >= 0 and now <= self._ends[i]
+
+
+lottery_windows = TimeWindows()
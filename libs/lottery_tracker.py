@@ -0,0 +1,122 @@
+# 标准库
+import time
+import asyncio
+from datetime import datetime, timedelta
+from collections import OrderedDict
+
+# 自定义模块
+from libs.log import logger
+from models.lottery_db_modle import Lottery
+
+
+# 创建后超过这么久仍未开奖的抽奖不再跟踪
+LOTTERY_TTL = timedelta(days=2)
+# 内存中最多跟踪的抽奖数，超出时淘汰最早创建的
+MAX_ACTIVE = 500
+
+
+class LotteryTracker:
+    """
+    自动抽奖跟踪
+
+    未开奖的抽奖按创建顺序保存在内存中，按 lottery_id O(1) 查找；所有变更同时写入 lottery 表。
+    首次使用时从表中恢复未开奖且未过期的抽奖，重启前创建的抽奖开奖时也能找到。
+    过期或超过 MAX_ACTIVE 的抽奖从内存淘汰，表中记录保留用于统计
+    """
+
+    def __init__(self):
+        # lottery_id -> {"keyword", "boss_name", "boss_ID", "ptsite", "prizechat", "flag", "expire_at"}
+        self._active: OrderedDict[str, dict] = OrderedDict()
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            for row in await Lottery.get_active_lotteries():
+                self._active[row.lottery_id] = {
+                    "keyword": row.keyword,
+                    "boss_name": row.boss_name,
+                    "boss_ID": row.boss_id,
+                    "ptsite": row.website,
+                    "prizechat": row.chat_id,
+                    "flag": int(row.joined),
+                    "expire_at": row.expire_time.timestamp(),
+                }
+            self._loaded = True
+            if self._active:
+                logger.info(f"恢复 {len(self._active)} 个未开奖的抽奖")
+
+    def _evict(self):
+        now = time.time()
+        while self._active:
+            lottery_id, entry = next(iter(self._active.items()))
+            if entry["expire_at"] > now and len(self._active) <= MAX_ACTIVE:
+                break
+            self._active.popitem(last=False)
+            logger.info(f"抽奖 {lottery_id} 超时未开奖或跟踪数超限，不再跟踪")
+
+    async def add(self, lottery_id: str, keyword: str, boss_name: str, boss_id: str, ptsite: str, chat_id: int, prize: str = ""):
+        await self._ensure_loaded()
+        expire_time = datetime.now() + LOTTERY_TTL
+        self._active[lottery_id] = {
+            "keyword": keyword,
+            "boss_name": boss_name,
+            "boss_ID": boss_id,
+            "ptsite": ptsite,
+            "prizechat": chat_id,
+            "flag": 0,
+            "expire_at": expire_time.timestamp(),
+        }
+        self._active.move_to_end(lottery_id)
+        self._evict()
+        await Lottery.add_lottery(
+            lottery_id=lottery_id,
+            expire_time=expire_time,
+            website=ptsite,
+            chat_id=chat_id,
+            keyword=keyword,
+            boss_name=boss_name,
+            boss_id=boss_id,
+            prize=prize[:255],
+        )
+
+    async def get(self, lottery_id: str) -> dict | None:
+        """
+        未开奖且未过期的抽奖，没有则为 None
+        """
+        await self._ensure_loaded()
+        entry = self._active.get(lottery_id)
+        if entry and entry["expire_at"] <= time.time():
+            self._evict()
+            return None
+        return entry
+
+    async def mark_joined(self, lottery_id: str):
+        if entry := await self.get(lottery_id):
+            entry["flag"] = 1
+        await Lottery.update_lottery(lottery_id, joined=True)
+
+    async def finish(self, lottery_id: str, won: bool):
+        """开奖后移出跟踪并记录是否中奖"""
+        await self._ensure_loaded()
+        if self._active.pop(lottery_id, None) is not None:
+            await Lottery.update_lottery(lottery_id, finished=True, won=won)
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    async def stats(self) -> dict[str, dict]:
+        """
+        各站点跟踪、参与、中奖次数
+        """
+        return {
+            website: {"tracked": int(total), "joined": int(joined or 0), "won": int(won or 0)}
+            for website, total, joined, won in await Lottery.get_site_stats()
+        }
+
+
+lottery_tracker = LotteryTracker()
@@ -0,0 +1,32 @@
+# 标准库
+from collections import OrderedDict
+
+# 第三方库
+from pyrogram.types import Message
+
+
+class MessageCache:
+    """
+    按 (chat_id, message_id) 缓存最近的消息，超出 maxsize 时淘汰最早放入的
+    """
+
+    def __init__(self, maxsize: int = 200):
+        self.maxsize = maxsize
+        self._messages: OrderedDict[tuple[int, int], Message] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, message: Message):
+        key = (message.chat.id, message.id)
+        self._messages[key] = message
+        self._messages.move_to_end(key)
+        if len(self._messages) > self.maxsize:
+            self._messages.popitem(last=False)
+
+    def get(self, chat_id: int, message_id: int) -> Message | None:
+        message = self._messages.get((chat_id, message_id))
+        if message is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return message
@@ -0,0 +1,95 @@
+# 标准库
+import asyncio
+
+# 自定义模块
+from config.config import PT_GROUP_ID
+from libs.flood_budget import Digest
+from libs.log import logger
+
+
+# 严重级别
+CRITICAL = "critical"  # 立即发送
+WARNING = "warning"  # 最多合并 WARNING_WINDOW 秒
+INFO = "info"  # 按主题的窗口合并
+LEVEL_ICONS = {CRITICAL: "🚨", WARNING: "⚠️", INFO: ""}
+WARNING_WINDOW = 60
+DEFAULT_WINDOW = 300
+
+# 主题: (摘要标题, 合并窗口秒数)
+TOPICS = {
+    "lottery": ("🎁 自动抽奖", 120),
+    "lottery_skip": ("🎁 以下抽奖不参与", 600),
+    "redpocket": ("🧧 红包", 300),
+    "backup": ("💾 数据库备份", 60),
+    "archive": ("🗄️ 数据归档", 60),
+    "bonus": ("💰 魔力收入", 300),
+    "health": ("🩺 网络健康", 60),
+    "shutdown": ("🛑 程序关闭", 60),
+}
+
+
+class NotificationBus:
+    """
+    BOT_MESSAGE_CHAT 通知总线
+
+    critical 级别立即发送；其余按 (主题, 级别) 放入 Digest，
+    窗口内的多条通知合并为一条以主题为标题的消息，减少 API 调用
+    """
+
+    def __init__(self):
+        self._digests: dict[tuple[str, str], Digest] = {}
+        self.received = 0
+        self.sent = 0
+
+    async def _send(self, text: str):
+        from app import get_bot_app
+
+        self.sent += 1
+        await get_bot_app().send_message(PT_GROUP_ID["BOT_MESSAGE_CHAT"], text)
+
+    def _digest(self, topic: str, level: str) -> Digest:
+        key = (topic, level)
+        if key not in self._digests:
+            title, window = TOPICS.get(topic, (topic, DEFAULT_WINDOW))
+            if level == WARNING:
+                window = min(window, WARNING_WINDOW)
+            title = f"{LEVEL_ICONS[level]} {title}".strip()
+            self._digests[key] = Digest(self._send, title, window=window)
+        return self._digests[key]
+
+    async def notify(self, text: str, level: str = INFO, topic: str = "通知"):
+        """
+        发送一条通知
+
+        参数:
+            text: 通知内容
+            level: CRITICAL / WARNING / INFO
+            topic: 主题，决定摘要标题与合并窗口，见 TOPICS
+        """
+        self.received += 1
+        if level == CRITICAL:
+            try:
+                await self._send(f"{LEVEL_ICONS[CRITICAL]} {text}")
+            except Exception as e:
+                logger.warning(f"通知发送失败: {e}")
+            return
+        self._digest(topic, level).add(text)
+
+    async def flush(self):
+        """立即发出所有待合并的通知，关闭前调用"""
+        await asyncio.gather(*(digest.flush() for digest in self._digests.values()))
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "sent": self.sent,
+            "pending": {
+                f"{topic}/{level}": len(digest)
+                for (topic, level), digest in self._digests.items()
+                if len(digest)
+            },
+        }
+
+
+notify_bus = NotificationBus()
+notify = notify_bus.notify
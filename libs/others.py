@@ -1,5 +1,4 @@
 # 标准库
-import asyncio
 from datetime import datetime, time, timedelta
 
 # 第三方库
@@ -8,27 +7,21 @@ from pyrogram.types import Message
 from pyrogram.errors import PeerIdInvalid
 
 # 自定义模块
+from libs.delete_scheduler import delete_scheduler
 from libs.log import logger
 
 
 
-async def delete_message(message_del: Message, sleep_time: float = 35) -> asyncio.Task:
+async def delete_message(message_del: Message, sleep_time: float = 35):
     """
-    删除 Telegram 消息，非阻塞方式在指定时间后执行删除，返回任务对象。
+    删除 Telegram 消息，非阻塞方式在指定时间后执行删除。
+    由 delete_scheduler 统一排队，到期后按会话批量删除，重启后继续。
 
     Args:
         message_del: 要删除的 Telegram 消息对象
         sleep_time: 延迟时间（秒），默认 35 秒
-
-    Returns:
-        asyncio.Task: 可用于取消或跟踪删除任务
     """
-
-    async def delayed_delete():
-        await asyncio.sleep(sleep_time)
-        await message_del.delete()
-
-    return asyncio.create_task(delayed_delete())
+    delete_scheduler.schedule(message_del, sleep_time)
 
 
 async def get_user_info(client: Client, tgid):
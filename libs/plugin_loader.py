@@ -0,0 +1,135 @@
+# 标准库
+import ast
+import sys
+import time
+from pathlib import Path
+from importlib import import_module
+
+# 自定义模块
+from libs.log import logger
+from libs.state import state_manager
+
+
+# 插件子目录与 state.toml 表头不一致的站点
+SITE_SECTIONS = {"u2_dmhy": "U2DMHY"}
+# 不属于任何站点、始终加载的目录
+ALWAYS_LOAD = {"universal"}
+# 按站点划分插件的目录
+PLUGIN_ROOTS = ("user_scripts", "bot_scripts")
+# 启动日志中显示最慢的前几项
+PROFILE_TOP = 8
+
+
+def site_section(site: str) -> str:
+    return SITE_SECTIONS.get(site, site.upper())
+
+
+def site_enabled(site: str) -> bool:
+    """
+    站点表头下 enable = "off" 时不加载该站点的插件，通过 /plugins 站点 on/off 设置，重启后生效
+    """
+    if site in ALWAYS_LOAD:
+        return True
+    return state_manager.get_item(site_section(site), "enable", "on") != "off"
+
+
+def plugin_sites(roots: tuple[str, ...] = PLUGIN_ROOTS) -> list[str]:
+    """
+    roots 下可以单独停用的站点目录
+    """
+    sites = set()
+    for root in roots:
+        for path in Path(root.replace(".", "/")).iterdir():
+            if path.is_dir() and path.name not in ALWAYS_LOAD and not path.name.startswith("__"):
+                sites.add(path.name)
+    return sorted(sites)
+
+
+def plugin_modules(root: str) -> tuple[list[str], list[str]]:
+    """
+    列出 root 下需要加载的插件模块
+
+    返回:
+        (模块路径列表，相对 root，如 "zhuque.ydx_zhuque", 被跳过的站点列表)
+    """
+    modules, skipped = [], set()
+    root_path = Path(root.replace(".", "/"))
+    for path in sorted(root_path.rglob("*.py")):
+        relative = path.relative_to(root_path)
+        if path.stem == "__init__" or "__pycache__" in relative.parts:
+            continue
+        if len(relative.parts) > 1 and not site_enabled(relative.parts[0]):
+            skipped.add(relative.parts[0])
+            continue
+        modules.append(".".join(relative.parent.parts + (relative.stem,)))
+    return modules, sorted(skipped)
+
+
+def _direct_imports(module_path: str) -> list[str]:
+    """模块顶层的绝对导入"""
+    try:
+        source = Path(module_path.replace(".", "/") + ".py").read_text(encoding="utf-8")
+        tree = ast.parse(source)
+    except (OSError, SyntaxError):
+        return []
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.append(node.module)
+    return names
+
+
+class ImportProfile:
+    """
+    插件导入耗时
+
+    先逐个导入插件顶层依赖中尚未加载的模块并计时，再导入插件本身，
+    插件耗时只包含它自己的代码和已计入依赖之外的部分
+    """
+
+    def __init__(self):
+        self.plugins: dict[str, float] = {}
+        # 依赖 -> (耗时, 首次引入它的插件)
+        self.dependencies: dict[str, tuple[float, str]] = {}
+        self.total = 0.0
+
+    def load(self, root: str, modules: list[str]):
+        start = time.perf_counter()
+        for module in modules:
+            module_path = f"{root}.{module}"
+            for name in _direct_imports(module_path):
+                if name in sys.modules:
+                    continue
+                t = time.perf_counter()
+                try:
+                    import_module(name)
+                except Exception:
+                    # 交给插件导入时按原样报错
+                    continue
+                self.dependencies[name] = (time.perf_counter() - t, module)
+            t = time.perf_counter()
+            try:
+                import_module(module_path)
+            except Exception as e:
+                logger.error(f"插件 {module_path} 导入失败: {e}")
+                continue
+            self.plugins[module] = time.perf_counter() - t
+        self.total = time.perf_counter() - start
+
+    def report(self, name: str, skipped: list[str]):
+        lines = [f"{name} 插件导入 {len(self.plugins)} 个，共 {self.total * 1000:.0f}ms"]
+        if skipped:
+            lines.append(f"  已停用站点: {', '.join(skipped)}")
+        slow_plugins = sorted(self.plugins.items(), key=lambda x: x[1], reverse=True)[:PROFILE_TOP]
+        lines.append(
+            "  插件: " + ", ".join(f"{module} {cost * 1000:.0f}ms" for module, cost in slow_plugins)
+        )
+        slow_deps = sorted(self.dependencies.items(), key=lambda x: x[1][0], reverse=True)[:PROFILE_TOP]
+        if slow_deps:
+            lines.append(
+                "  依赖: "
+                + ", ".join(f"{dep} {cost * 1000:.0f}ms ({module})" for dep, (cost, module) in slow_deps)
+            )
+        logger.info("\n".join(lines))
@@ -0,0 +1,136 @@
+# 标准库
+import time
+import asyncio
+from datetime import datetime
+
+# 第三方库
+from pyrogram import Client
+
+# 自定义模块
+from libs.log import logger
+
+
+# 同时进行的 delete_messages 请求数
+PRUNE_CONCURRENCY = 3
+# delete_messages 单次最多 100 条
+BATCH_SIZE = 100
+
+
+class PruneProgress:
+    """
+    节流的删除进度，最多每 interval 秒调用一次 callback(found, deleted)
+    """
+
+    def __init__(self, callback=None, interval: float = 3):
+        self.callback = callback
+        self.interval = interval
+        self.found = 0
+        self.deleted = 0
+        self._last = 0.0
+
+    async def update(self, force: bool = False):
+        now = time.monotonic()
+        if not self.callback or (not force and now - self._last < self.interval):
+            return
+        self._last = now
+        try:
+            await self.callback(self.found, self.deleted)
+        except Exception as e:
+            logger.warning(f"删除进度更新失败: {e}")
+
+
+def parse_count(arg: str) -> int:
+    """
+    解析删除数量参数，all 表示不限（返回 0），否则必须是正整数
+
+    异常:
+        ValueError: 既不是 all 也不是正整数
+    """
+    if arg == "all":
+        return 0
+    count = int(arg) if arg.isdigit() else 0
+    if count < 1:
+        raise ValueError(arg)
+    return count
+
+
+async def _delete_batch(client: Client, chat_id: int, message_ids: list[int]) -> int:
+    """删除一批消息，FloodWait 由 Client 的调度层处理"""
+    return await client.delete_messages(chat_id, message_ids)
+
+
+async def prune_own_messages(
+    client: Client,
+    chat_id: int,
+    count: int = 0,
+    min_date: datetime | None = None,
+    max_date: datetime | None = None,
+    max_id: int = 0,
+    dry_run: bool = False,
+    progress: PruneProgress | None = None,
+    concurrency: int = PRUNE_CONCURRENCY,
+) -> tuple[int, int]:
+    """
+    通过服务端按发送者搜索删除自己在会话中发的消息
+
+    每次搜索一页（最多 BATCH_SIZE 条）放入队列，由 concurrency 个删除任务并发处理，搜索翻页与删除同时进行。
+    翻页不用 offset（已删除的消息会让后面的页错位而漏删），而是以已找到的最小 id 作为下一页的 max_id
+
+    参数:
+        client: 用户账号
+        chat_id: 会话
+        count: 最多删除条数，0 表示不限
+        min_date / max_date: 只删除该时间范围内（不含端点）的消息
+        max_id: 只删除 id 小于 max_id 的消息，0 表示不限
+        dry_run: 只统计不删除
+        progress: 进度
+
+    返回:
+        tuple[int, int]: (找到条数, 已删除条数)
+    """
+    progress = progress or PruneProgress()
+    queue: asyncio.Queue[list[int] | None] = asyncio.Queue(maxsize=concurrency)
+
+    async def worker():
+        while (batch := await queue.get()) is not None:
+            try:
+                await _delete_batch(client, chat_id, batch)
+                progress.deleted += len(batch)
+                await progress.update()
+            except Exception as e:
+                logger.error(f"删除 {chat_id} 的 {len(batch)} 条消息失败: {e}")
+
+    workers = [] if dry_run else [asyncio.create_task(worker()) for _ in range(concurrency)]
+    remaining = count or None
+    try:
+        while remaining is None or remaining > 0:
+            limit = BATCH_SIZE if remaining is None else min(BATCH_SIZE, remaining)
+            batch = [
+                msg.id
+                async for msg in client.search_messages(
+                    chat_id,
+                    from_user="me",
+                    min_date=min_date,
+                    max_date=max_date,
+                    max_id=max_id,
+                    limit=limit,
+                )
+            ]
+            if not batch:
+                break
+            max_id = min(batch)
+            progress.found += len(batch)
+            if remaining is not None:
+                remaining -= len(batch)
+            if dry_run:
+                await progress.update()
+            else:
+                await queue.put(batch)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+    await progress.update(force=True)
+    return progress.found, progress.deleted
@@ -0,0 +1,46 @@
+# 标准库
+from datetime import datetime, timedelta
+
+# 自定义模块
+from libs.log import logger
+from models.transform_db_modle import Raiding
+
+
+class RaidCooldown:
+    """
+    打劫冷却
+
+    按 (站点, 行为) 记录最近一次打劫的时间和次数，冷却时间为 raidcount 分钟。
+    启动时从 raiding 表恢复最近一条记录，之后每写入一条打劫记录同步 record，判断冷却不再查询数据库
+    """
+
+    def __init__(self):
+        # (站点, 行为) -> (时间, raidcount)
+        self._latest: dict[tuple[str, str], tuple[datetime, int]] = {}
+
+    async def seed(self, website: str, action: str = "raiding"):
+        latest = await Raiding.get_latest_raiding_createtime(website, action)
+        if latest:
+            create_time, raidcount = latest
+            self.record(website, action, raidcount, create_time)
+            logger.info(f"{website} 最近一次{action}: {create_time:%H:%M:%S} ×{raidcount}")
+
+    def record(self, website: str, action: str, raidcount: int, at: datetime | None = None):
+        at = at or datetime.now()
+        current = self._latest.get((website, action))
+        if current is None or at >= current[0]:
+            self._latest[(website, action)] = (at, raidcount)
+
+    def remaining(self, website: str, action: str = "raiding") -> timedelta:
+        """距冷却结束的时间，没有记录或已冷却时为 0"""
+        latest = self._latest.get((website, action))
+        if latest is None:
+            return timedelta(0)
+        at, raidcount = latest
+        return max(at + timedelta(minutes=float(raidcount)) - datetime.now(), timedelta(0))
+
+    def ready(self, website: str, action: str = "raiding") -> bool:
+        return not self.remaining(website, action)
+
+
+raid_cooldown = RaidCooldown()
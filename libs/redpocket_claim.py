@@ -0,0 +1,275 @@
+# 标准库
+import re
+import time
+import random
+import asyncio
+import statistics
+from collections import OrderedDict
+from typing import NamedTuple
+
+# 第三方库
+from pyrogram import Client
+from pyrogram.types import Message
+
+# 自定义模块
+from libs.log import logger
+
+
+# 机器人回调文本的分类，成功文本由各站点提供
+NOT_STARTED_PATTERN = r"未开始|还没开始|尚未开始|稍后"
+FINISHED_PATTERN = r"[抢领]完|已结束|已过期|已失效|没有了|不存在"
+CLAIMED_PATTERN = r"已经?[领抢]取?过|重复领取|不能重复|已领取"
+
+
+class ClaimPolicy:
+    """
+    红包领取策略
+
+    - start_delay: 收到红包后等待多久开始领取（秒）
+    - max_attempts: 最多请求次数
+    - min_interval: 未开始时的请求间隔，默认 0（仅受回调往返时间限制）
+    - retry_interval / max_interval: 未知回复或超时时从 retry_interval 起
+      按 backoff 倍数退避，最多 max_interval
+    - success_pattern: 成功文本，第一个分组为领到的数量
+    """
+
+    def __init__(
+        self,
+        success_pattern: str,
+        start_delay: float = 0,
+        max_attempts: int = 500,
+        min_interval: float = 0,
+        retry_interval: float = 0.2,
+        max_interval: float = 3.0,
+        backoff: float = 1.5,
+        timeout: float = 5,
+        not_started_pattern: str = NOT_STARTED_PATTERN,
+        finished_pattern: str = FINISHED_PATTERN,
+        claimed_pattern: str = CLAIMED_PATTERN,
+    ):
+        self.success = re.compile(success_pattern)
+        self.not_started = re.compile(not_started_pattern)
+        self.finished = re.compile(finished_pattern)
+        self.claimed = re.compile(claimed_pattern)
+        self.start_delay = start_delay
+        self.max_attempts = max_attempts
+        self.min_interval = min_interval
+        self.retry_interval = retry_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def classify(self, text: str | None) -> tuple[str, str | None]:
+        """
+        回调文本分类
+
+        返回:
+            tuple[str, str|None]: (success|not_started|finished|claimed|unknown, 领到的数量)
+        """
+        if not text:
+            return "unknown", None
+        if match := self.success.search(text):
+            return "success", match.group(1)
+        if self.claimed.search(text):
+            return "claimed", None
+        if self.finished.search(text):
+            return "finished", None
+        if self.not_started.search(text):
+            return "not_started", None
+        return "unknown", None
+
+
+class ClaimResult(NamedTuple):
+    status: str  # success / finished / claimed / cancelled / exhausted(次数用完) / error
+    bonus: str | None
+    attempts: int
+    latency: float  # 从收到红包到得到最终结果的秒数
+
+
+class RedpocketClaimer:
+    """
+    红包领取引擎：同一红包（chat_id, message_id）只领取一次，编辑消息不会重复触发；
+    领取过程可按红包取消
+    """
+
+    def __init__(self, max_seen: int = 1000):
+        self._seen = OrderedDict()
+        self._max_seen = max_seen
+        self._tasks: dict[tuple[int, int], asyncio.Task] = {}
+
+    @staticmethod
+    def key(message: Message) -> tuple[int, int]:
+        return message.chat.id, message.id
+
+    def register(self, message: Message) -> bool:
+        """
+        登记红包消息，已登记过（重复推送或编辑）返回 False
+        """
+        key = self.key(message)
+        if key in self._seen:
+            return False
+        self._seen[key] = True
+        if len(self._seen) > self._max_seen:
+            self._seen.popitem(last=False)
+        return True
+
+    def cancel(self, message: Message) -> bool:
+        """取消正在进行的领取"""
+        task = self._tasks.get(self.key(message))
+        if task and not task.done():
+            task.cancel()
+            return True
+        return False
+
+    async def claim(self, client: Client, message: Message, policy: ClaimPolicy) -> ClaimResult:
+        """
+        按策略领取红包，直到成功、红包结束、已领过、被取消或次数用完
+        """
+        key = self.key(message)
+        task = asyncio.create_task(self._run(client, message, policy))
+        self._tasks[key] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return ClaimResult("cancelled", None, 0, 0)
+            raise
+        finally:
+            self._tasks.pop(key, None)
+
+    async def _run(self, client: Client, message: Message, policy: ClaimPolicy) -> ClaimResult:
+        start = time.monotonic()
+        callback_data = message.reply_markup.inline_keyboard[0][0].callback_data
+        interval = policy.min_interval
+        await asyncio.sleep(policy.start_delay)
+
+        for attempt in range(1, policy.max_attempts + 1):
+            try:
+                answer = await client.request_callback_answer(
+                    chat_id=message.chat.id,
+                    message_id=message.id,
+                    callback_data=callback_data,
+                    timeout=policy.timeout,
+                )
+                status, bonus = policy.classify(getattr(answer, "message", None))
+            except TimeoutError:
+                logger.warning("CallbackAnswer 超时，可能是 Telegram 卡顿或 query 已失效")
+                status, bonus = "unknown", None
+            except Exception as e:
+                logger.exception(f"第 {attempt} 次提交失败: 请求回调异常: {e}")
+                return ClaimResult("error", None, attempt, time.monotonic() - start)
+
+            if status in ("success", "finished", "claimed"):
+                return ClaimResult(status, bonus, attempt, time.monotonic() - start)
+            if status == "not_started":
+                interval = policy.min_interval
+            else:
+                interval = min(
+                    max(interval * policy.backoff, policy.retry_interval),
+                    policy.max_interval,
+                )
+            await asyncio.sleep(interval)
+
+        return ClaimResult("exhausted", None, policy.max_attempts, time.monotonic() - start)
+
+
+redpocket_claimer = RedpocketClaimer()
+
+
+class _SimAnswer(NamedTuple):
+    message: str
+
+
+class _SimMessage:
+    """模拟红包消息，只提供 claim 用到的属性"""
+
+    class _Chat(NamedTuple):
+        id: int
+
+    class _Button(NamedTuple):
+        callback_data: str
+
+    class _Markup(NamedTuple):
+        inline_keyboard: list
+
+    def __init__(self, message_id: int):
+        self.id = message_id
+        self.chat = self._Chat(0)
+        self.reply_markup = self._Markup([[self._Button("claim")]])
+
+
+class _SimBot:
+    """
+    模拟红包机器人：open_at 秒后开抢，exhaust_at 秒后抢完，每次回调耗时 rtt（带 ±50% 抖动）
+    """
+
+    def __init__(self, open_at: float, exhaust_at: float, rtt: float):
+        self.start = time.monotonic()
+        self.open_at = open_at
+        self.exhaust_at = exhaust_at
+        self.rtt = rtt
+        self.opened_latency = None
+
+    async def request_callback_answer(self, chat_id, message_id, callback_data, timeout):
+        await asyncio.sleep(self.rtt * random.uniform(0.5, 1.5))
+        now = time.monotonic() - self.start
+        if now < self.open_at:
+            return _SimAnswer("红包还未开始，请稍后")
+        if now > self.exhaust_at:
+            return _SimAnswer("红包已经被抢完了")
+        self.opened_latency = now - self.open_at
+        return _SimAnswer("成功领取红包，增加100象草")
+
+
+async def simulate(
+    policy: ClaimPolicy,
+    runs: int = 200,
+    open_range: tuple[float, float] = (0, 2),
+    window: float = 1.5,
+    rtt: float = 0.05,
+) -> str:
+    """
+    领取延迟模拟：并发跑 runs 个红包，红包在 open_range 内随机时间开抢，
+    开抢 window 秒后抢完。统计 成功率、开抢到领到的延迟 与 请求次数
+
+    返回:
+        str: 统计报告
+    """
+    claimer = RedpocketClaimer()
+
+    async def one(i: int):
+        open_at = random.uniform(*open_range)
+        bot = _SimBot(open_at, open_at + window, rtt)
+        result = await claimer.claim(bot, _SimMessage(i), policy)
+        return result, bot.opened_latency
+
+    results = await asyncio.gather(*(one(i) for i in range(runs)))
+    latencies = sorted(lat for r, lat in results if r.status == "success")
+    statuses = {}
+    for r, _ in results:
+        statuses[r.status] = statuses.get(r.status, 0) + 1
+    lines = [
+        f"runs={runs} 结果={statuses}",
+        f"平均请求次数 {statistics.mean(r.attempts for r, _ in results):.1f}",
+    ]
+    if latencies:
+        lines.append(
+            f"开抢后领到延迟 mean={statistics.mean(latencies) * 1000:.0f}ms "
+            f"p50={latencies[len(latencies) // 2] * 1000:.0f}ms "
+            f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}ms"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    success = r"成功领取红包，增加(\d+)象草"
+    policies = (
+        # 原实现：不间隔重试，不识别“已抢完”
+        ("原逻辑", ClaimPolicy(success, retry_interval=0, backoff=1, finished_pattern=r"(?!)")),
+        ("自适应", ClaimPolicy(success)),
+    )
+    # (开抢时间范围, 开抢后多久抢完)，负数表示收到时已开抢
+    for open_range, window in (((0, 2), 1.5), ((-1, 1), 0.1)):
+        for name, policy in policies:
+            print(f"== {name} 开抢 {open_range}s 后 {window}s 抢完 ==")
+            print(asyncio.run(simulate(policy, open_range=open_range, window=window)))
@@ -0,0 +1,167 @@
+# 标准库
+import math
+import time
+import asyncio
+import hashlib
+from datetime import timedelta
+
+# 自定义模块
+from libs.log import logger
+from libs.state import state_manager
+from libs.tmdb_cache import normalize_title
+from models.share115_db_modle import Share115Seen
+
+
+SITE_NAME = "SHARE115TOCMS"
+# 默认有效期（天），可通过 state 中 SHARE115TOCMS.dedupe_days 修改
+DEFAULT_TTL_DAYS = 30
+# 布隆过滤器按此容量（至少为有效记录数的两倍）和误判率分配，写满或每隔 REBUILD_INTERVAL 秒从数据库重建
+BLOOM_CAPACITY = 100_000
+BLOOM_ERROR_RATE = 0.001
+REBUILD_INTERVAL = 24 * 3600
+
+
+class BloomFilter:
+    """
+    布隆过滤器，add 之后 "in" 一定为 True，未 add 的键有 error_rate 的概率误判为 True
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key_hash: str):
+        # 双重哈希：由 sha1 的两段派生 hash_count 个位置
+        h1 = int(key_hash[:16], 16)
+        h2 = int(key_hash[16:32], 16) | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key_hash: str):
+        for pos in self._positions(key_hash):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key_hash: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key_hash))
+
+
+def key_hash(kind: str, value: str) -> str:
+    return hashlib.sha1(f"{kind}:{value}".encode("utf-8")).hexdigest()
+
+
+def title_key(title: str, year) -> str:
+    return f"{normalize_title(title)}|{year or ''}"
+
+
+class SeenIndex:
+    """
+    115 分享去重索引
+
+    已转发的链接和标题写入 share115_seen 表（带过期时间），内存中的布隆过滤器保存全部未过期键。
+    查询时布隆过滤器判定不存在（绝大多数新消息）直接返回，不访问数据库；
+    判定可能存在时再查表确认，排除误判和已过期的记录
+    """
+
+    def __init__(self):
+        self._bloom: BloomFilter | None = None
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self.checked = 0
+        self.skipped = 0
+        self.db_lookups = 0
+        self.false_positives = 0
+
+    @staticmethod
+    def ttl() -> timedelta:
+        return timedelta(days=int(state_manager.get_item(SITE_NAME, "dedupe_days", DEFAULT_TTL_DAYS)))
+
+    def _stale(self) -> bool:
+        return (
+            self._bloom is None
+            or self._bloom.count >= self._bloom.capacity
+            or time.monotonic() - self._built_at >= REBUILD_INTERVAL
+        )
+
+    async def _ensure_bloom(self) -> BloomFilter:
+        if not self._stale():
+            return self._bloom
+        async with self._lock:
+            if self._stale():
+                purged = await Share115Seen.purge_expired()
+                hashes = await Share115Seen.get_active_hashes()
+                bloom = BloomFilter(max(BLOOM_CAPACITY, len(hashes) * 2), BLOOM_ERROR_RATE)
+                for h in hashes:
+                    bloom.add(h)
+                self._bloom, self._built_at = bloom, time.monotonic()
+                logger.info(f"115 去重索引已重建: {len(hashes)} 条有效记录，清理过期 {purged} 条")
+        return self._bloom
+
+    async def _seen(self, kind: str, value: str) -> bool:
+        h = key_hash(kind, value)
+        if h not in await self._ensure_bloom():
+            return False
+        self.db_lookups += 1
+        if await Share115Seen.is_active(h):
+            return True
+        self.false_positives += 1
+        return False
+
+    async def seen_link(self, link: str) -> bool:
+        return await self._seen("link", link)
+
+    async def seen_title(self, title: str, year) -> bool:
+        return await self._seen("title", title_key(title, year))
+
+    async def should_skip(self, links: list[str], title: str, year) -> bool:
+        """
+        消息中的链接都已转发过，或同一标题已转发过时跳过，统计节省的处理次数
+        """
+        self.checked += 1
+        try:
+            skip = bool(links)
+            for link in links:
+                if not await self.seen_link(link):
+                    skip = False
+                    break
+            if not skip and title:
+                skip = await self.seen_title(title, year)
+        except Exception as e:
+            # 去重失败不影响正常处理
+            logger.error(f"115 去重索引查询失败: {e}")
+            return False
+        if skip:
+            self.skipped += 1
+        return skip
+
+    async def mark(self, links: list[str], title: str = None, year=None):
+        """
+        记录已转发的链接和标题
+        """
+        items = [(key_hash("link", link), "link") for link in links]
+        if title:
+            items.append((key_hash("title", title_key(title, year)), "title"))
+        try:
+            bloom = await self._ensure_bloom()
+            await Share115Seen.add_hashes(items, self.ttl())
+        except Exception as e:
+            logger.error(f"115 去重索引写入失败: {e}")
+            return
+        for h, _ in items:
+            bloom.add(h)
+
+    def stats(self) -> dict:
+        return {
+            "entries": self._bloom.count if self._bloom else 0,
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "db_lookups": self.db_lookups,
+            "false_positives": self.false_positives,
+            "saved_rate": self.skipped / self.checked if self.checked else 0.0,
+        }
+
+
+seen_index = SeenIndex()
@@ -0,0 +1,154 @@
+# 标准库
+import time
+import asyncio
+
+# 第三方库
+from pyrogram import Client
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+# 自定义模块
+from libs.log import logger
+from libs.notify import WARNING, notify
+
+
+# 等待进行中的处理器、调度任务完成的最长秒数，需小于 supervisor 的 stopwaitsecs（默认 10 秒）
+DRAIN_TIMEOUT = 8
+DRAIN_POLL = 0.1
+
+
+class ShutdownCoordinator:
+    """
+    优雅关闭
+
+    1. 停止接收：accepting 置为 False，startup 的前置处理器丢弃之后到达的更新，调度器暂停
+    2. 排空：等待各账号正在执行的处理器、调度任务以及 track 登记的后台任务，最多 DRAIN_TIMEOUT 秒
+    3. 刷新：按注册顺序执行 add_flusher 登记的函数（通知摘要、删除队列等）
+    4. 依次停止调度器和各账号，最后报告被放弃的任务
+    """
+
+    def __init__(self):
+        self.accepting = True
+        self._tracked: dict[asyncio.Task, str] = {}
+        self._flushers: list[tuple[str, object]] = []
+
+    def track(self, coro, name: str) -> asyncio.Task:
+        """登记需要在关闭前完成的后台任务"""
+        task = asyncio.create_task(coro, name=name)
+        self._tracked[task] = name
+        task.add_done_callback(self._tracked.pop)
+        return task
+
+    def add_flusher(self, name: str, func):
+        """登记关闭时执行的刷新函数 async func()"""
+        self._flushers.append((name, func))
+
+    @staticmethod
+    def _busy_handlers(client: Client) -> int:
+        # dispatcher 的每个 worker 处理更新期间持有自己的锁
+        return sum(lock.locked() for lock in client.dispatcher.locks_list)
+
+    @staticmethod
+    def _running_jobs(scheduler: AsyncIOScheduler) -> list:
+        if not scheduler.running:
+            # 未启动的调度器还没有 executor
+            return []
+        executor = scheduler._lookup_executor("default")
+        return [f for f in getattr(executor, "_pending_futures", ()) if not f.done()]
+
+    async def _drain(
+        self, clients: list[Client], scheduler: AsyncIOScheduler, timeout: float, caller: Client = None
+    ) -> list[str]:
+        deadline = time.monotonic() + timeout
+        while True:
+            abandoned = [
+                f"{client.name} 处理器 ×{busy}"
+                for client in clients
+                # 在处理器中调用时不等待调用方自身
+                if (busy := self._busy_handlers(client) - (client is caller))
+            ]
+            if jobs := self._running_jobs(scheduler):
+                abandoned.append(f"调度任务 ×{len(jobs)}")
+            abandoned.extend(name for task, name in self._tracked.items() if not task.done())
+            if not abandoned or time.monotonic() >= deadline:
+                return abandoned
+            await asyncio.sleep(DRAIN_POLL)
+
+    @staticmethod
+    async def _stop_client(client: Client):
+        dispatcher = client.dispatcher
+        stuck = [t for t in dispatcher.handler_worker_tasks if not t.done()]
+        if any(lock.locked() for lock in dispatcher.locks_list):
+            # 仍卡在处理器里的 worker 直接取消，否则 stop 会一直等待
+            for task in stuck:
+                task.cancel()
+            await asyncio.gather(*stuck, return_exceptions=True)
+            dispatcher.handler_worker_tasks.clear()
+        await client.stop()
+
+    async def pause(
+        self,
+        clients: list[Client],
+        scheduler: AsyncIOScheduler,
+        timeout: float = DRAIN_TIMEOUT,
+        caller: Client = None,
+    ) -> list[str]:
+        """
+        停止接收新更新并暂停调度器，等待进行中的处理器和调度任务完成（步骤 1、2），之后只能重启恢复
+
+        参数:
+            caller: 在处理器中调用时传入所属账号，不等待调用方自身
+
+        返回:
+            list[str]: 超时后仍未完成的任务
+        """
+        self.accepting = False
+        if scheduler.running:
+            scheduler.pause()
+        abandoned = await self._drain(clients, scheduler, timeout, caller)
+        if abandoned:
+            logger.warning(f"等待 {timeout} 秒后仍未完成，放弃: {', '.join(abandoned)}")
+        return abandoned
+
+    async def shutdown(
+        self,
+        clients: list[Client],
+        scheduler: AsyncIOScheduler,
+        timeout: float = DRAIN_TIMEOUT,
+    ) -> list[str]:
+        """
+        按顺序关闭，clients 依次停止（通知用的 bot 放在最后）
+
+        返回:
+            list[str]: 超时后被放弃的任务
+        """
+        start = time.monotonic()
+        abandoned = await self.pause(clients, scheduler, timeout)
+        if abandoned:
+            await notify(f"关闭时放弃: {', '.join(abandoned)}", level=WARNING, topic="shutdown")
+        for task in list(self._tracked):
+            task.cancel()
+
+        for name, func in self._flushers:
+            try:
+                await func()
+            except Exception as e:
+                logger.error(f"关闭时 {name} 刷新失败: {e}")
+
+        if scheduler.running:
+            scheduler.shutdown(wait=False)
+        for client in clients:
+            if not client.is_connected:
+                continue
+            try:
+                await self._stop_client(client)
+            except Exception as e:
+                logger.error(f"{client.name} 停止失败: {e}")
+
+        logger.info(
+            f"关闭完成，用时 {time.monotonic() - start:.1f} 秒"
+            + (f"，放弃 {len(abandoned)} 项" if abandoned else "，全部任务已完成")
+        )
+        return abandoned
+
+
+shutdown_coordinator = ShutdownCoordinator()
@@ -0,0 +1,86 @@
+# 标准库
+import time
+import asyncio
+
+# 第三方库
+from pyrogram import Client, StopPropagation
+from pyrogram.handlers import RawUpdateHandler
+
+# 自定义模块
+from libs.log import logger
+from libs.shutdown import shutdown_coordinator
+
+
+# 数据库初始化完成前，所有更新在这一组等待；开始关闭后在这一组丢弃
+READY_GROUP = -1000
+
+
+class StartupError(Exception):
+    """必需的启动阶段失败"""
+
+
+class StartupOrchestrator:
+    """
+    按依赖关系并发执行启动阶段
+
+    每个阶段在其依赖全部完成后立即开始，互不依赖的阶段（两个账号登录、数据库初始化）同时进行。
+    必需阶段失败时取消依赖它的阶段并抛出 StartupError，非必需阶段失败只记录日志。
+    """
+
+    def __init__(self):
+        # 名称 -> (协程函数, 依赖, 是否必需)
+        self._stages: dict[str, tuple] = {}
+        self.results: dict[str, object] = {}
+        self.timings: dict[str, float] = {}
+
+    def add(self, name: str, func, deps: tuple[str, ...] = (), required: bool = True):
+        self._stages[name] = (func, deps, required)
+
+    async def run(self):
+        start = time.perf_counter()
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str):
+            func, deps, required = self._stages[name]
+            for dep in deps:
+                await tasks[dep]
+            t = time.perf_counter()
+            try:
+                self.results[name] = await func()
+            except Exception as e:
+                if required:
+                    raise StartupError(f"{name} 启动失败: {e}") from e
+                logger.error(f"启动阶段 {name} 失败: {e}")
+            finally:
+                self.timings[name] = time.perf_counter() - t
+
+        for name in self._stages:
+            tasks[name] = asyncio.create_task(run_stage(name), name=f"startup:{name}")
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            total = time.perf_counter() - start
+            detail = ", ".join(f"{name} {cost:.2f}s" for name, cost in self.timings.items())
+            logger.info(f"启动耗时 {total:.2f}s: {detail}")
+
+
+db_ready = asyncio.Event()
+
+
+def gate_until_ready(client: Client):
+    """
+    在最前面的分组注册前置处理器：db_ready 之前收到的更新先等待，不会提前触发插件；
+    开始关闭后不再把更新交给插件
+    """
+
+    async def wait_ready(client, update, users, chats):
+        await db_ready.wait()
+        if not shutdown_coordinator.accepting:
+            raise StopPropagation
+
+    client.add_handler(RawUpdateHandler(wait_ready), READY_GROUP)
@@ -0,0 +1,136 @@
+# 标准库
+import re
+import json
+import time
+import asyncio
+from pathlib import Path
+
+# 自定义模块
+from libs.log import logger
+
+
+TMDB_CACHE_FILE = Path("db_file/tmdb_cache.json")
+# 有结果的缓存 7 天，TMDB 确实没有结果时只缓存 6 小时（网络错误直接抛出，不写入缓存）
+TTL = 7 * 24 * 3600
+EMPTY_TTL = 6 * 3600
+# 最多缓存条数，超出时淘汰最早写入的
+MAX_ENTRIES = 5000
+# 有新结果时最多每隔这么多秒写一次文件
+SAVE_INTERVAL = 30
+
+
+def normalize_title(title: str) -> str:
+    """忽略大小写、空白和标点"""
+    return re.sub(r"[\W_]+", " ", title or "").strip().lower()
+
+
+class TmdbCache:
+    """
+    TMDB 搜索结果缓存
+
+    键为 (规范化标题, 年份, 语言)，结果持久化到 TMDB_CACHE_FILE。
+    同一个键并发查询时只发起一次请求，其余调用等待同一个结果
+    """
+
+    def __init__(self, path: Path = TMDB_CACHE_FILE):
+        self.path = path
+        # 键 -> [过期时间戳, 结果]
+        self._data: dict[str, list] | None = None
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._dirty = False
+        self._saved_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(title: str, year, language: str) -> str:
+        return f"{normalize_title(title)}|{year or ''}|{language}"
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                self._data = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"TMDB 缓存读取失败，重新建立: {e}")
+                self._data = {}
+        return self._data
+
+    async def get(self, title: str, year, language: str, fetch) -> list[dict]:
+        """
+        缓存命中直接返回，否则调用 async fetch() 查询并写入缓存
+        """
+        key = self.key(title, year, language)
+        data = self._load()
+        entry = data.get(key)
+        if entry and entry[0] > time.time():
+            self.hits += 1
+            return entry[1]
+
+        if key in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._inflight.pop(key, None)
+
+        data[key] = [time.time() + (TTL if result else EMPTY_TTL), result]
+        if len(data) > MAX_ENTRIES:
+            data.pop(next(iter(data)))
+        self._dirty = True
+        await self._maybe_save()
+        return result
+
+    async def _maybe_save(self):
+        if not self._dirty or time.monotonic() - self._saved_at < SAVE_INTERVAL:
+            return
+        await self.save()
+
+    async def save(self):
+        if self._data is None:
+            return
+        now = time.time()
+        data = json.dumps(
+            {key: entry for key, entry in self._data.items() if entry[0] > now},
+            ensure_ascii=False,
+        )
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+        def write():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(data, encoding="utf-8")
+            tmp_path.replace(self.path)
+
+        try:
+            await asyncio.to_thread(write)
+        except OSError as e:
+            logger.warning(f"保存 TMDB 缓存失败: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._load()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / total if total else 0.0,
+        }
+
+
+tmdb_cache = TmdbCache()
@@ -3,11 +3,12 @@ import os
 import uuid
 from pathlib import Path
 
-# 第三方库
-import imgkit
-from pygments import highlight
-from pygments.lexers.configs import IniLexer
-from pygments.formatters import HtmlFormatter
+# 自定义模块
+from libs.lazy_import import lazy_import
+
+
+imgkit = lazy_import("imgkit")
+
 
 async def toml_file_to_image(toml_file_path: Path):
     if os.name == "nt":
@@ -26,7 +27,11 @@ async def toml_file_to_image(toml_file_path: Path):
     img_file = Path(f"temp_file/state_table_{unique_id}.png")
     html_file.parent.mkdir(parents=True, exist_ok=True)
 
-    # 用 pygments 生成 HTML
+    # 用 pygments 生成 HTML（只在这里用到，按需导入）
+    from pygments import highlight
+    from pygments.lexers.configs import IniLexer
+    from pygments.formatters import HtmlFormatter
+
     formatter = HtmlFormatter(full=True, linenos=True, style="colorful")
     html = highlight(toml_code, IniLexer(), formatter)
 
@@ -0,0 +1,161 @@
+# 标准库
+import time
+import random
+import asyncio
+from collections import deque
+
+# 自定义模块
+from libs.log import logger
+from libs.shutdown import shutdown_coordinator
+
+
+# 重试间隔从 BACKOFF_BASE 秒起按 2 倍递增（带 ±50% 抖动），最多 BACKOFF_MAX 秒
+BACKOFF_BASE = 2
+BACKOFF_MAX = 30
+
+
+class WorkQueue:
+    """
+    有界异步任务队列
+
+    - submit 只把任务放进队列，由 workers 个后台任务依次执行，处理器不再被慢请求占住
+    - 队列满时丢弃最早的任务（新消息更有价值），同一 key 已在排队时直接合并
+    - run_stage 限制各阶段（如 tmdb / emby / cms）的并发，失败时按退避重试
+    - 执行中的任务通过 shutdown_coordinator.track 登记，关闭时等待完成；未开始的任务在关闭时放弃
+    """
+
+    def __init__(self, name: str, maxsize: int, workers: int, stage_limits: dict[str, int]):
+        self.name = name
+        self.maxsize = maxsize
+        self.workers = workers
+        # (key, 名称, 协程函数, 参数, 入队时间)
+        self._queue: deque[tuple] = deque()
+        self._keys: set[str] = set()
+        self._not_empty: asyncio.Event | None = None
+        self._workers: list[asyncio.Task] = []
+        self._stages = {stage: asyncio.Semaphore(limit) for stage, limit in stage_limits.items()}
+        self._stage_limits = stage_limits
+        self._stage_active = dict.fromkeys(stage_limits, 0)
+        self._stage_waiting = dict.fromkeys(stage_limits, 0)
+        self.submitted = 0
+        self.done = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.max_depth = 0
+        self.wait_max = 0.0
+
+    def submit(self, func, *args, key: str = None, name: str = ""):
+        """
+        放入队列，立即返回
+
+        参数:
+            func: 协程函数，执行 func(*args)
+            key: 相同 key 的任务已在排队时不再重复放入
+            name: 日志和关闭报告中显示的名称
+        """
+        if key is not None and key in self._keys:
+            self.coalesced += 1
+            return
+        if len(self._queue) >= self.maxsize:
+            old_key, old_name, *_ = self._queue.popleft()
+            self._keys.discard(old_key)
+            self.dropped += 1
+            logger.warning(f"{self.name} 队列已满（{self.maxsize}），丢弃最早的任务: {old_name}")
+        self._queue.append((key, name, func, args, time.monotonic()))
+        if key is not None:
+            self._keys.add(key)
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ensure_workers()
+        self._not_empty.set()
+
+    async def run_stage(self, stage: str, func, *args, retries: int = 0, retry_on: tuple = (Exception,)):
+        """
+        在 stage 的并发限制内执行 func(*args)，遇到 retry_on 中的异常最多重试 retries 次
+        """
+        semaphore = self._stages[stage]
+        for attempt in range(retries + 1):
+            self._stage_waiting[stage] += 1
+            try:
+                await semaphore.acquire()
+            finally:
+                self._stage_waiting[stage] -= 1
+            self._stage_active[stage] += 1
+            try:
+                return await func(*args)
+            except retry_on as e:
+                if attempt == retries:
+                    raise
+                error = e
+            finally:
+                self._stage_active[stage] -= 1
+                semaphore.release()
+            delay = min(BACKOFF_BASE * 2**attempt, BACKOFF_MAX) * random.uniform(0.5, 1.5)
+            self.retries += 1
+            logger.warning(f"{self.name} {stage} 第 {attempt + 1} 次失败，{delay:.1f} 秒后重试: {error}")
+            await asyncio.sleep(delay)
+
+    def _ensure_workers(self):
+        if self._not_empty is None:
+            self._not_empty = asyncio.Event()
+            shutdown_coordinator.add_flusher(f"{self.name} 队列", self.stop)
+        self._workers = [task for task in self._workers if not task.done()]
+        for i in range(len(self._workers), self.workers):
+            self._workers.append(asyncio.create_task(self._run(), name=f"{self.name}-worker-{i}"))
+
+    async def _run(self):
+        while shutdown_coordinator.accepting:
+            if not self._queue:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+            key, name, func, args, enqueued_at = self._queue.popleft()
+            self._keys.discard(key)
+            self.wait_max = max(self.wait_max, time.monotonic() - enqueued_at)
+            try:
+                await shutdown_coordinator.track(func(*args), f"{self.name}:{name}")
+                self.done += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"{self.name} 任务 {name} 失败: {e}")
+
+    async def stop(self):
+        """停止后台任务，报告未开始的任务"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        if self._queue:
+            logger.warning(f"{self.name} 队列关闭时放弃 {len(self._queue)} 个未开始的任务")
+            self._queue.clear()
+            self._keys.clear()
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "maxsize": self.maxsize,
+            "submitted": self.submitted,
+            "done": self.done,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "wait_max": self.wait_max,
+            "stages": {
+                stage: {
+                    "active": self._stage_active[stage],
+                    "waiting": self._stage_waiting[stage],
+                    "limit": limit,
+                }
+                for stage, limit in self._stage_limits.items()
+            },
+        }
+
+
+# 115 分享处理：TMDB 搜索、Emby 查询、转发给 CMS
+share115_queue = WorkQueue("share115", maxsize=200, workers=4, stage_limits={"tmdb": 2, "emby": 2, "cms": 1})
@@ -3,15 +3,16 @@ from abc import ABC, abstractmethod
 import asyncio
 import random
 
-# 第三方库
-import pandas as pd
-import numpy as np
-
 # 自定义
 from app import logger
+from libs.lazy_import import lazy_import
 from models.ydx_db_modle import make_KDJ, make_MACD, Zhuqueydx
 
 
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+
 class BetModel(ABC):
     fail_count: int = 0
     guess_dx: int = -1
@@ -11,17 +11,11 @@ import asyncio
 
 # 自定义模块
 from app import start_app
-from libs.watch_log import monitor_log_file
 
 
 async def main():
-    log_configs = {
-        "log_file_path": "logs/main_err.log",
-        "trigger_string": "Request timed out",
-        "command": "supervisorctl restart main",
-    }
-
-    await asyncio.gather(start_app(), monitor_log_file(**log_configs))
+    # 网络异常由 libs.health 在进程内监控，只重连出问题的账号
+    await start_app()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 # 标准库
 import asyncio
 from pathlib import Path
+from importlib import import_module
 from urllib.parse import quote_plus
 
 # 第三方库
@@ -67,6 +68,9 @@ async_session_maker = async_scoped_session(
 
 
 async def create_all():
+    # 数据库初始化与插件加载并发进行，先导入全部数据表模型，保证 Base.metadata 完整
+    for path in Path(__file__).parent.glob("*_modle.py"):
+        import_module(f"models.{path.stem}")
     async with async_engine.begin() as conn:
 
         if DB_INFO["dbset"] == "SQLite":
@@ -0,0 +1,206 @@
+# 标准库
+from datetime import datetime, timedelta
+
+# 第三方库
+from sqlalchemy import (
+    Column,
+    MetaData,
+    Table,
+    String,
+    BigInteger,
+    case,
+    cast,
+    delete,
+    func,
+    inspect,
+    insert,
+    literal,
+    null,
+    select,
+)
+
+# 自定义模块
+from libs.log import logger
+from models import async_engine, async_session_maker
+from models.redpocket_db_modle import Redpocket
+from models.rollup_db_modle import ArchiveRollup
+from models.transform_db_modle import Transform
+from models.ydx_db_modle import Zhuqueydx
+
+
+# 可归档的表：模型 -> (bonus 字段, category 字段, 是否有 user_id)
+# raiding 的统计和打劫冷却只查询源表，不归档
+ARCHIVE_MODELS = {
+    Transform: ("bonus", None, True),
+    Redpocket: ("bonus", "gamemode", False),
+    Zhuqueydx: ("win_amount", "lottery_result", False),
+}
+
+# 月度归档表不属于 Base.metadata，避免 create_all 时被创建
+archive_metadata = MetaData()
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def next_month(value: datetime) -> datetime:
+    return month_start(month_start(value) + timedelta(days=32))
+
+
+def archive_table_name(table_name: str, month: datetime) -> str:
+    return f"{table_name}_archive_{month:%Y%m}"
+
+
+def get_archive_table(table: Table, month: datetime) -> Table:
+    """
+    获取 (表, 月份) 对应的归档表定义，字段与源表一致
+    """
+    name = archive_table_name(table.name, month)
+    if name in archive_metadata.tables:
+        return archive_metadata.tables[name]
+    return Table(
+        name,
+        archive_metadata,
+        *[
+            Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False)
+            for c in table.columns
+        ],
+    )
+
+
+async def ensure_archive_table(table: Table, month: datetime) -> Table:
+    archive = get_archive_table(table, month)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(archive.create, checkfirst=True)
+    return archive
+
+
+async def archive_tables(table: Table, start=None, end=None) -> list[Table]:
+    """
+    查询已存在的归档表（按月份升序），可按 [start, end) 时间范围筛选
+
+    参数:
+        table: 源表
+        start (datetime|None): 起始时间
+        end (datetime|None): 结束时间（不含）
+
+    返回:
+        list[Table]: 与时间范围有交集的归档表
+    """
+    async with async_engine.connect() as conn:
+        names = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+    prefix = f"{table.name}_archive_"
+    months = sorted(
+        datetime.strptime(name[len(prefix):], "%Y%m")
+        for name in names
+        if name.startswith(prefix) and name[len(prefix):].isdigit()
+    )
+    return [
+        get_archive_table(table, month)
+        for month in months
+        if (start is None or next_month(month) > start) and (end is None or month < end)
+    ]
+
+
+def rollup_select(model, *conditions):
+    """
+    将源表行按天/站点/用户/分类/方向汇总，供 INSERT ... SELECT 写入 ArchiveRollup
+    """
+    table = model.__table__
+    bonus_name, category_name, has_user = ARCHIVE_MODELS[model]
+    bonus = table.c[bonus_name]
+    day = func.date(table.c.create_time)
+    user_id = table.c.user_id if has_user else cast(null(), BigInteger)
+    category = table.c[category_name] if category_name else literal("", String)
+    direction = case((bonus < 0, "pay"), (bonus > 0, "get"), else_="")
+    group_by = [day, table.c.website, category, direction]
+    if has_user:
+        group_by.append(table.c.user_id)
+    return (
+        select(
+            literal(table.name, String),
+            day,
+            table.c.website,
+            user_id,
+            category,
+            direction,
+            func.count(),
+            func.sum(bonus),
+        )
+        .where(*conditions)
+        .group_by(*group_by)
+    )
+
+
+ROLLUP_COLUMNS = [
+    "table_name",
+    "day",
+    "website",
+    "user_id",
+    "category",
+    "direction",
+    "record_count",
+    "bonus_sum",
+]
+
+
+async def archive_model(model, cutoff: datetime) -> int:
+    """
+    把 create_time 早于 cutoff 的行按月搬到归档表，并写入按天汇总
+    每个月在一个事务中完成 复制 → 汇总 → 删除
+
+    返回:
+        int: 归档的行数
+    """
+    table = model.__table__
+    async with async_session_maker() as session, session.begin():
+        oldest = (
+            await session.execute(
+                select(func.min(table.c.create_time)).where(table.c.create_time < cutoff)
+            )
+        ).scalar_one_or_none()
+    if not oldest:
+        return 0
+
+    moved = 0
+    month = month_start(oldest)
+    while month < cutoff:
+        upper = min(next_month(month), cutoff)
+        conditions = [table.c.create_time >= month, table.c.create_time < upper]
+        archive = await ensure_archive_table(table, month)
+        async with async_session_maker() as session, session.begin():
+            await session.execute(
+                insert(archive).from_select(
+                    [c.name for c in table.columns], select(*table.columns).where(*conditions)
+                )
+            )
+            await session.execute(
+                insert(ArchiveRollup).from_select(
+                    ROLLUP_COLUMNS, rollup_select(model, *conditions)
+                )
+            )
+            result = await session.execute(delete(table).where(*conditions))
+            moved += result.rowcount or 0
+        month = next_month(month)
+    if moved:
+        logger.info(f"归档 {table.name}: {moved} 行早于 {cutoff:%Y-%m-%d} 的记录")
+    return moved
+
+
+async def archive_old_rows(horizon_days: int) -> dict[str, int]:
+    """
+    归档所有事件表中早于 horizon_days 天的记录
+
+    返回:
+        dict[str, int]: 表名 -> 归档行数
+    """
+    cutoff = datetime.combine(
+        datetime.now().date() - timedelta(days=horizon_days), datetime.min.time()
+    )
+    async with async_engine.begin() as conn:
+        await conn.run_sync(ArchiveRollup.__table__.create, checkfirst=True)
+    return {
+        model.__tablename__: await archive_model(model, cutoff)
+        for model in ARCHIVE_MODELS
+    }
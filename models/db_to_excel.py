@@ -1,50 +1,214 @@
 # 标准库
+import csv
+import gzip
+import asyncio
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # 第三方库
-from sqlalchemy import select
-import pandas as pd
+from sqlalchemy import select, Integer, Numeric, DateTime
 
 # 自定义模块
+from libs import others
 from models import async_session_maker
+from models.archive import archive_tables
 
 
-async def export_table_to_file(table_class, file_type='excel'):
+# 每批从数据库游标读取的行数，决定导出时的内存占用上限
+CHUNK_SIZE = 2000
+
+
+class CsvWriter:
+    """
+    CSV 增量写入，可选 gzip 压缩
+    """
+
+    extension = "csv"
+
+    def __init__(self, file_path: Path, columns: list, compress: bool = False):
+        if compress:
+            self._file = gzip.open(file_path, "wt", encoding="utf-8", newline="")
+        else:
+            self._file = open(file_path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([c.name for c in columns])
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ExcelWriter:
+    """
+    XLSX 只写模式增量写入（xlsx 本身即为 zip 压缩格式）
+    """
+
+    extension = "xlsx"
+
+    def __init__(self, file_path: Path, columns: list, compress: bool = False):
+        from openpyxl import Workbook
+
+        self._file_path = file_path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+        self._sheet.append([c.name for c in columns])
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._sheet.append(tuple(row))
+
+    def close(self):
+        self._workbook.save(self._file_path)
+
+
+class ParquetWriter:
+    """
+    Parquet 按批次写入 row group，compress 时使用 zstd 压缩
+    """
+
+    extension = "parquet"
+
+    def __init__(self, file_path: Path, columns: list, compress: bool = False):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("导出 parquet 需要安装 pyarrow")
+
+        self._pa = pa
+        self._schema = pa.schema([(c.name, _arrow_type(pa, c)) for c in columns])
+        self._writer = pq.ParquetWriter(
+            file_path, self._schema, compression="zstd" if compress else "snappy"
+        )
+
+    def write_rows(self, rows):
+        pa = self._pa
+        values = list(zip(*rows))
+        arrays = [
+            pa.array(col, type=field.type) for col, field in zip(values, self._schema)
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def _arrow_type(pa, column):
+    """SQLAlchemy 字段类型映射为 pyarrow 类型"""
+    column_type = column.type
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Numeric):
+        return pa.decimal128(column_type.precision or 38, column_type.scale or 0)
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+FILE_WRITERS = {
+    "excel": ExcelWriter,
+    "csv": CsvWriter,
+    "parquet": ParquetWriter,
+}
+
+
+def build_conditions(table, start=None, end=None, website=None) -> list:
     """
-    Export the given SQLAlchemy ORM table to a file (CSV or Excel).
+    构造导出过滤条件
+
+    Parameters:
+    - table: SQLAlchemy Table
+    - start: 起始时间（含），datetime|None
+    - end: 结束时间（不含），datetime|None
+    - website: 站点名称
+
+    Returns:
+    - list: where 条件列表
+    """
+    conditions = []
+    if start or end:
+        if "create_time" not in table.c:
+            raise ValueError(f"{table.name} 没有 create_time 字段，不支持日期过滤")
+        if start:
+            conditions.append(table.c.create_time >= start)
+        if end:
+            conditions.append(table.c.create_time < end)
+    if website:
+        if "website" not in table.c:
+            raise ValueError(f"{table.name} 没有 website 字段，不支持站点过滤")
+        conditions.append(table.c.website == website)
+    return conditions
+
+
+async def export_table_to_file(
+    table_class,
+    file_type="excel",
+    start_date=None,
+    end_date=None,
+    website=None,
+    compress=False,
+):
+    """
+    Stream the given SQLAlchemy ORM table to a file (CSV, Excel or Parquet).
+
+    Rows are read as raw tuples through a server-side cursor in chunks of
+    CHUNK_SIZE and every chunk is written in a worker thread, so memory stays
+    flat regardless of table size and the event loop is never blocked.
+    Monthly archive tables overlapping the date range are read first, so
+    archived rows are exported transparently.
 
     Parameters:
     - table_class: SQLAlchemy ORM class (e.g., User)
-    - file_type: 'csv' or 'excel' (default: 'excel')
+    - file_type: 'csv', 'excel' or 'parquet' (default: 'excel')
+    - start_date / end_date: optional create_time range, end date inclusive
+    - website: optional website filter
+    - compress: gzip for csv, zstd for parquet (xlsx is always zipped)
 
     Returns:
     - Path object pointing to the exported file
     """
-    # 选择文件扩展名
-    extension = "xlsx" if file_type == "excel" else "csv"
+    writer_class = FILE_WRITERS.get(file_type)
+    if writer_class is None:
+        raise ValueError("file_type must be 'csv', 'excel' or 'parquet'.")
+
+    table = table_class.__table__
+    columns = list(table.columns)
+    start = others.parse_date_input(start_date) if start_date else None
+    end = others.parse_date_input(end_date) + timedelta(days=1) if end_date else None
+    # 先校验过滤条件是否适用于该表
+    build_conditions(table, start, end, website)
+    tables = await archive_tables(table, start, end) + [table]
 
     # 构造唯一文件名
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    extension = writer_class.extension
+    if compress and writer_class is CsvWriter:
+        extension += ".gz"
     file_name = f"temp_{table_class.__name__}_{timestamp}.{extension}"
     file_path = Path("temp_file") / file_name
 
     # 确保输出目录存在
     file_path.parent.mkdir(parents=True, exist_ok=True)
 
-    async with async_session_maker() as session:
-        result = await session.execute(select(table_class))
-        rows = result.scalars().all()
-
-        # 用模型字段顺序构造 DataFrame
-        columns = [c.name for c in table_class.__table__.columns]
-        df = pd.DataFrame([{col: getattr(row, col) for col in columns} for row in rows])
-        # 根据类型导出文件
-        if file_type == 'excel':
-            df.to_excel(file_path, index=False)
-        elif file_type == 'csv':
-            df.to_csv(file_path, index=False)
-        else:
-            raise ValueError("file_type must be 'csv' or 'excel'.")
+    writer = await asyncio.to_thread(writer_class, file_path, columns, compress)
+    try:
+        for source in tables:
+            stmt = (
+                select(*source.columns)
+                .where(*build_conditions(source, start, end, website))
+                .order_by(*source.primary_key.columns)
+                .execution_options(yield_per=CHUNK_SIZE)
+            )
+            async with async_session_maker() as session:
+                result = await session.stream(stmt)
+                async for rows in result.partitions(CHUNK_SIZE):
+                    await asyncio.to_thread(writer.write_rows, rows)
+    except BaseException:
+        await asyncio.to_thread(writer.close)
+        file_path.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(writer.close)
 
     return file_path
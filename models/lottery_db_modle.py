@@ -0,0 +1,85 @@
+# 标准库
+from datetime import datetime
+
+# 第三方库
+from sqlalchemy import String, BigInteger, Boolean, DateTime, func, select, update, case
+from sqlalchemy.orm import mapped_column, Mapped
+
+# 自定义模块
+from models.database import Base
+from models import async_session_maker
+
+
+class Lottery(Base):
+    """
+    小菜自动抽奖记录
+
+    website: 奖品对应的站点键（PRIZE_LIST 的键，如 ZHUQUE_ID）
+    joined: 是否已发送参与关键词
+    finished: 是否已开奖，won: 是否中奖
+    expire_time: 之后仍未开奖的抽奖不再跟踪
+    """
+
+    __tablename__ = "lottery"
+    lottery_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    create_time: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    expire_time: Mapped[datetime] = mapped_column(DateTime, index=True)
+    website: Mapped[str] = mapped_column(String(32))
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    keyword: Mapped[str] = mapped_column(String(128))
+    boss_name: Mapped[str] = mapped_column(String(64))
+    boss_id: Mapped[str] = mapped_column(String(32))
+    prize: Mapped[str] = mapped_column(String(255), default="")
+    joined: Mapped[bool] = mapped_column(Boolean, default=False)
+    finished: Mapped[bool] = mapped_column(Boolean, default=False)
+    won: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    @classmethod
+    async def add_lottery(cls, **fields):
+        """
+        写入抽奖记录，同一 lottery_id 已存在时覆盖
+        """
+        async with async_session_maker() as session, session.begin():
+            await session.merge(cls(**fields))
+
+    @classmethod
+    async def update_lottery(cls, lottery_id: str, **fields):
+        """
+        更新抽奖记录的指定字段
+        """
+        async with async_session_maker() as session, session.begin():
+            await session.execute(update(cls).where(cls.lottery_id == lottery_id).values(**fields))
+
+    @classmethod
+    async def get_active_lotteries(cls) -> list["Lottery"]:
+        """
+        未开奖且未过期的抽奖，按创建时间排序
+        """
+        async with async_session_maker() as session, session.begin():
+            stmt = (
+                select(cls)
+                .where(cls.finished.is_(False), cls.expire_time > datetime.now())
+                .order_by(cls.create_time)
+            )
+            return list((await session.execute(stmt)).scalars())
+
+    @classmethod
+    async def get_site_stats(cls) -> list[tuple[str, int, int, int]]:
+        """
+        按站点统计
+
+        返回:
+            list[(website, 跟踪数, 参与数, 中奖数)]
+        """
+        async with async_session_maker() as session, session.begin():
+            stmt = (
+                select(
+                    cls.website,
+                    func.count(),
+                    func.sum(case((cls.joined.is_(True), 1), else_=0)),
+                    func.sum(case((cls.won.is_(True), 1), else_=0)),
+                )
+                .group_by(cls.website)
+                .order_by(cls.website)
+            )
+            return [tuple(row) for row in (await session.execute(stmt)).all()]
@@ -9,6 +9,7 @@ from sqlalchemy.orm import mapped_column, Mapped
 from libs import others
 from models.database import Base
 from models import async_session_maker
+from models.rollup_db_modle import ArchiveRollup
 
 
 
@@ -73,7 +74,7 @@ class Redpocket(Base):
         gamemode: str,
     ) -> float:
         """
-        获取当前指定站点、指定模式下红包 bonus 的总和
+        获取当前指定站点、指定模式下红包 bonus 的总和（含已归档记录）
 
         参数:
             website (str): 站点名称
@@ -87,7 +88,16 @@ class Redpocket(Base):
                 cls.website == website, cls.gamemode == gamemode
             )
             bonus_sum = (await session.execute(stmt)).scalar_one_or_none()
-            return bonus_sum if bonus_sum is not None else 0
+            _, archived_sum = (
+                await session.execute(
+                    ArchiveRollup.totals(
+                        *ArchiveRollup.conditions(
+                            cls.__tablename__, website, category=gamemode
+                        )
+                    )
+                )
+            ).one()
+            return (bonus_sum or 0) + archived_sum
 
     @classmethod
     async def get_bonus_count_sum_redpocket_for_website(
@@ -99,7 +109,7 @@ class Redpocket(Base):
         end_date=None,
     ) -> tuple[int, float]:
         """
-        获取指定站点与模式下，指定时间范围内红包的总次数与奖金。
+        获取指定站点与模式下，指定时间范围内红包的总次数与奖金（含已归档记录）。
 
         参数:
             website (str): 站点名称
@@ -116,6 +126,7 @@ class Redpocket(Base):
                 cls.website == website,
                 cls.gamemode == gamemode,
             ]
+            start_day = end_day = None
             if status == "pay":
                 conditions.append(Redpocket.bonus < 0)
             elif status == "get":
@@ -131,8 +142,9 @@ class Redpocket(Base):
                 conditions.extend(
                     [Redpocket.create_time >= start, Redpocket.create_time < end]
                 )
-            bonus_sum_stmt = select(func.sum(Redpocket.bonus)).where(conditions)
-            bonus_count_stmt = select(func.count()).where(conditions)
+                start_day, end_day = start.date(), end.date()
+            bonus_sum_stmt = select(func.sum(Redpocket.bonus)).where(*conditions)
+            bonus_count_stmt = select(func.count()).select_from(Redpocket).where(*conditions)
             # 执行查询
             bonus_sum = (
                 await session.execute(bonus_sum_stmt)
@@ -140,4 +152,18 @@ class Redpocket(Base):
             bonus_count = (
                 await session.execute(bonus_count_stmt)
             ).scalar_one_or_none() or 0
-            return bonus_count, float(bonus_sum)
+            archived_count, archived_sum = (
+                await session.execute(
+                    ArchiveRollup.totals(
+                        *ArchiveRollup.conditions(
+                            cls.__tablename__,
+                            website,
+                            direction=status,
+                            category=gamemode,
+                            start_day=start_day,
+                            end_day=end_day,
+                        )
+                    )
+                )
+            ).one()
+            return bonus_count + archived_count, float(bonus_sum + archived_sum)
@@ -0,0 +1,79 @@
+# 标准库
+from datetime import date
+
+# 第三方库
+from sqlalchemy import String, Integer, BigInteger, Numeric, Date, func, select
+from sqlalchemy.orm import mapped_column, Mapped
+
+# 自定义模块
+from models.database import Base
+
+
+class ArchiveRollup(Base):
+    """
+    归档行的按天汇总，归档后保持各类统计总额不变
+
+    table_name: 源表名（transform / redpocket / zhuque_ydx）
+    category: redpocket 为 gamemode，zhuque_ydx 为 lottery_result
+    direction: bonus < 0 为 "pay"，bonus > 0 为 "get"
+    bonus_sum: 源表 bonus 之和，zhuque_ydx 为 win_amount 之和
+    """
+
+    __tablename__ = "archive_rollup"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    table_name: Mapped[str] = mapped_column(String(32))
+    day: Mapped[date] = mapped_column(Date)
+    website: Mapped[str] = mapped_column(String(32))
+    user_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    category: Mapped[str] = mapped_column(String(32))
+    direction: Mapped[str] = mapped_column(String(8))
+    record_count: Mapped[int] = mapped_column(Integer)
+    bonus_sum: Mapped[float] = mapped_column(Numeric(16, 2))
+
+    @classmethod
+    def conditions(
+        cls,
+        table_name: str,
+        website: str,
+        direction: str | None = None,
+        category: str | None = None,
+        user_id: int | None = None,
+        start_day: date | None = None,
+        end_day: date | None = None,
+    ) -> list:
+        """
+        构造汇总表查询条件，end_day 不含当天
+        """
+        conditions = [cls.table_name == table_name, cls.website == website]
+        if direction in ("pay", "get"):
+            conditions.append(cls.direction == direction)
+        if category is not None:
+            conditions.append(cls.category == category)
+        if user_id is not None:
+            conditions.append(cls.user_id == user_id)
+        if start_day is not None:
+            conditions.append(cls.day >= start_day)
+        if end_day is not None:
+            conditions.append(cls.day < end_day)
+        return conditions
+
+    @classmethod
+    def totals(cls, *conditions):
+        """归档部分的 (次数, 总额) 查询"""
+        return select(
+            func.coalesce(func.sum(cls.record_count), 0),
+            func.coalesce(func.sum(cls.bonus_sum), 0),
+        ).where(*conditions)
+
+    @classmethod
+    def user_totals(cls, *conditions):
+        """按用户分组的归档 (user_id, bonus_count, bonus_sum)，用于与在线数据 union"""
+        return (
+            select(
+                cls.user_id.label("user_id"),
+                func.sum(cls.record_count).label("bonus_count"),
+                func.sum(cls.bonus_sum).label("bonus_sum"),
+            )
+            .where(*conditions)
+            .group_by(cls.user_id)
+        )
@@ -0,0 +1,68 @@
+# 标准库
+from datetime import datetime, timedelta
+
+# 第三方库
+from sqlalchemy import String, DateTime, func, select, delete
+from sqlalchemy.orm import mapped_column, Mapped
+
+# 自定义模块
+from models.database import Base
+from models import async_session_maker
+
+
+class Share115Seen(Base):
+    """
+    已转发给 CMS 的 115 链接和媒体标题
+
+    key_hash: 键的 sha1，键为 "link:链接" 或 "title:规范化标题|年份"
+    kind: link / title
+    """
+
+    __tablename__ = "share115_seen"
+    key_hash: Mapped[str] = mapped_column(String(40), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(8))
+    create_time: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    expire_time: Mapped[datetime] = mapped_column(DateTime, index=True)
+
+    @classmethod
+    async def get_active_hashes(cls) -> list[str]:
+        """
+        所有未过期记录的 key_hash
+        """
+        async with async_session_maker() as session, session.begin():
+            stmt = select(cls.key_hash).where(cls.expire_time > datetime.now())
+            return list((await session.execute(stmt)).scalars())
+
+    @classmethod
+    async def is_active(cls, key_hash: str) -> bool:
+        """
+        key_hash 是否存在且未过期
+        """
+        async with async_session_maker() as session, session.begin():
+            stmt = select(cls.key_hash).where(
+                cls.key_hash == key_hash, cls.expire_time > datetime.now()
+            )
+            return (await session.execute(stmt)).scalar_one_or_none() is not None
+
+    @classmethod
+    async def add_hashes(cls, items: list[tuple[str, str]], ttl: timedelta):
+        """
+        写入或续期记录
+
+        参数:
+            items: [(key_hash, kind)]
+            ttl: 有效期
+        """
+        expire_time = datetime.now() + ttl
+        async with async_session_maker() as session, session.begin():
+            for key_hash, kind in items:
+                await session.merge(cls(key_hash=key_hash, kind=kind, expire_time=expire_time))
+
+    @classmethod
+    async def purge_expired(cls) -> int:
+        """
+        删除过期记录，返回删除行数
+        """
+        async with async_session_maker() as session, session.begin():
+            result = await session.execute(delete(cls).where(cls.expire_time <= datetime.now()))
+            return result.rowcount
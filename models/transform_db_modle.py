@@ -4,13 +4,14 @@ from datetime import datetime
 
 # 第三方库
 from pyrogram.types import Message
-from sqlalchemy import String, Integer, BigInteger, Numeric, DateTime, func, desc, select
+from sqlalchemy import String, Integer, BigInteger, Numeric, DateTime, func, desc, select, union_all
 from sqlalchemy.orm import mapped_column, Mapped
 
 # 自定义模块
 from config.config import MY_TGID, MY_NAME
 from models import async_session_maker
 from models.database import Base, TimeBase
+from models.rollup_db_modle import ArchiveRollup
 
 
 class Raiding(Base):
@@ -113,7 +114,7 @@ class User(TimeBase):
 
     async def get_bonus_sum_for_website(self, site_name: str) -> float:
         """
-        获取当前用户在指定站点的 bonus 总和 正负相加的结果。
+        获取当前用户在指定站点的 bonus 总和 正负相加的结果（含已归档记录）。
         参数:
             site_name (str): 站点名称
         返回:
@@ -125,12 +126,21 @@ class User(TimeBase):
                 Transform.user_id == self.user_id, Transform.website == site_name
             )
             bonus_sum = (await session.execute(stmt)).scalar_one_or_none()
-            return bonus_sum if bonus_sum is not None else 0
+            _, archived_sum = (
+                await session.execute(
+                    ArchiveRollup.totals(
+                        *ArchiveRollup.conditions(
+                            Transform.__tablename__, site_name, user_id=self.user_id
+                        )
+                    )
+                )
+            ).one()
+            return (bonus_sum or 0) + archived_sum
 
     
     async def get_pay_bonus_count_sum_for_website(self, site_name: str, Direction: str) -> tuple[str, str]:
         """
-        获取当前用户在指定站点的我发送的 bonus 总和。
+        获取当前用户在指定站点的我发送的 bonus 总和（含已归档记录）。
         参数:
             site_name (str): 站点名称
         返回:
@@ -148,8 +158,20 @@ class User(TimeBase):
             )
             result = await session.execute(stmt)
             bonus_sum, bonus_count = result.one_or_none() or (0, 0)
-            bonus_sum = bonus_sum or 0
-            bonus_count = bonus_count or 0
+            archived_count, archived_sum = (
+                await session.execute(
+                    ArchiveRollup.totals(
+                        *ArchiveRollup.conditions(
+                            Transform.__tablename__,
+                            site_name,
+                            direction="pay" if Direction == "pay" else "get",
+                            user_id=self.user_id,
+                        )
+                    )
+                )
+            ).one()
+            bonus_sum = (bonus_sum or 0) + archived_sum
+            bonus_count = (bonus_count or 0) + archived_count
             return f"{bonus_count:,}", f"{abs(bonus_sum):,.2f}"
 
     async def get_pay_bonus_leaderboard_by_website(
@@ -166,23 +188,21 @@ class User(TimeBase):
             list: 排行榜数据
         """
         async with async_session_maker() as session, session.begin():
+            totals = _user_bonus_totals(site_name, Direction)
             if Direction == "pay":
-                flag = Transform.bonus < 0
-                sort_expr = desc(func.abs(func.sum(Transform.bonus)))
+                sort_expr = desc(func.abs(func.sum(totals.c.bonus_sum)))
             else:
-                flag = Transform.bonus > 0
-                sort_expr = desc(func.sum(Transform.bonus))
+                sort_expr = desc(func.sum(totals.c.bonus_sum))
 
             stmt = (
                 select(
-                    Transform.user_id,
+                    totals.c.user_id,
                     User.name,
-                    func.count().label("bonus_count"),
-                    func.sum(Transform.bonus).label("bonus_sum"),
+                    func.sum(totals.c.bonus_count).label("bonus_count"),
+                    func.sum(totals.c.bonus_sum).label("bonus_sum"),
                 )
-                .join(User, Transform.user_id == User.user_id)
-                .where(flag, Transform.website == site_name)
-                .group_by(Transform.user_id, User.name)
+                .join(User, totals.c.user_id == User.user_id)
+                .group_by(totals.c.user_id, User.name)
                 .order_by(sort_expr)
                 .limit(top_n)
             )
@@ -205,19 +225,17 @@ class User(TimeBase):
             int: 排名（未找到返回-1）
         """
         async with async_session_maker() as session, session.begin():
+            totals = _user_bonus_totals(website, Direction)
             if Direction == "pay":
-                flag = Transform.bonus < 0
-                sort_expr = desc(func.abs(func.sum(Transform.bonus)))
+                sort_expr = desc(func.abs(func.sum(totals.c.bonus_sum)))
             else:
-                flag = Transform.bonus > 0
-                sort_expr = desc(func.sum(Transform.bonus))
+                sort_expr = desc(func.sum(totals.c.bonus_sum))
 
             stmt = (
                 select(
-                    Transform.user_id, func.sum(Transform.bonus).label("total_bonus")
+                    totals.c.user_id, func.sum(totals.c.bonus_sum).label("total_bonus")
                 )
-                .where(flag, Transform.website == website)
-                .group_by(Transform.user_id)
+                .group_by(totals.c.user_id)
                 .order_by(sort_expr)
             )
 
@@ -307,6 +325,30 @@ class User(TimeBase):
             session.add(raiding)
 
 
+def _user_bonus_totals(website: str, Direction: str):
+    """
+    在线 transform 与归档汇总按用户 union 后的子查询 (user_id, bonus_count, bonus_sum)
+    """
+    flag = Transform.bonus < 0 if Direction == "pay" else Transform.bonus > 0
+    live = (
+        select(
+            Transform.user_id.label("user_id"),
+            func.count().label("bonus_count"),
+            func.sum(Transform.bonus).label("bonus_sum"),
+        )
+        .where(flag, Transform.website == website)
+        .group_by(Transform.user_id)
+    )
+    archived = ArchiveRollup.user_totals(
+        *ArchiveRollup.conditions(
+            Transform.__tablename__,
+            website,
+            direction="pay" if Direction == "pay" else "get",
+        )
+    )
+    return union_all(live, archived).subquery()
+
+
 ##################英文字母或者中文的转sha码###############################
 
 
@@ -1,16 +1,27 @@
 # 标准库
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
 # 第三方库
-from sqlalchemy import String, Integer, Numeric, DateTime, delete, func, desc, select
+from sqlalchemy import String, Integer, Numeric, DateTime, delete, func, desc, select, tuple_
 from sqlalchemy.orm import mapped_column, Mapped
-import pandas as pd
-import numpy as np
 
 # 自定义模块
 from models.database import Base
 from models import async_session_maker
+from libs.lazy_import import lazy_import
+from libs.log import logger
+
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+
+# 同一站点两条开奖记录的最小间隔，小于该间隔视为同一局的重复记录
+ROUND_WINDOW = timedelta(seconds=50)
+# 去重时每批读取/删除的记录数
+DEDUPE_CHUNK_SIZE = 1000
 
 
 class Zhuqueydx(Base):
@@ -30,6 +41,9 @@ class Zhuqueydx(Base):
     bet_amount: Mapped[float] = mapped_column(Numeric(16, 2))
     win_amount: Mapped[float] = mapped_column(Numeric(16, 2))
 
+    # 串行化“查最新记录 + 写入”，避免并发消息绕过重复检查
+    _record_lock = asyncio.Lock()
+
     @classmethod
     async def add_zhuque_ydx_result_record(
         cls,
@@ -41,9 +55,9 @@ class Zhuqueydx(Base):
         bet_count: int,
         bet_amount: float,
         win_amount: float,
-    ):
+    ) -> bool:
         """
-        ydx数据写入数据库
+        ydx数据写入数据库，同一局窗口（ROUND_WINDOW）内的重复开奖结果不会写入
 
         参数:
             website (str): 网站名称
@@ -55,9 +69,21 @@ class Zhuqueydx(Base):
             win_amount (float): 中奖金额
 
         返回:
-            None
+            bool: 是否写入
         """
-        async with async_session_maker() as session, session.begin():
+        async with cls._record_lock, async_session_maker() as session, session.begin():
+            latest_time, now = (
+                await session.execute(
+                    select(func.max(cls.create_time), func.now()).where(
+                        cls.website == website
+                    )
+                )
+            ).one()
+            if latest_time and now - latest_time < ROUND_WINDOW:
+                logger.warning(
+                    f"{website} ydx 上一条记录写入于 {latest_time}，同一局内的重复开奖结果已忽略"
+                )
+                return False
             redpocket = cls(
                 website=website,
                 die_point=die_point,
@@ -69,6 +95,7 @@ class Zhuqueydx(Base):
                 win_amount=win_amount,
             )
             session.add(redpocket)
+        return True
 
     @classmethod
     async def get_latest_ydx_info(
@@ -106,7 +133,7 @@ class Zhuqueydx(Base):
         cls, website: str = "zhuque", limit: int = 1
     ) -> Optional[Tuple[str, int, int, float]]:
         """
-        查询指定网站的最新 limit 条 die_point 记录。
+        查询指定网站的最新 limit 条 die_point 记录，在线数据不足时从归档表补齐。
 
         参数:
             website (str): 需要查询的站点标识。
@@ -126,41 +153,85 @@ class Zhuqueydx(Base):
                 .limit(limit)
             )
             result = (await session.execute(stmt)).scalars().all()
-            if result:
-                return result
-            return None
+        if len(result) < limit:
+            result = list(result) + await cls._get_archived_data(
+                website, limit - len(result)
+            )
+        if result:
+            return result
+        return None
 
     @classmethod
-    async def remove_duplicate_records(cls):
+    async def _get_archived_data(cls, website: str, limit: int) -> list[int]:
         """
-        删除与上条记录create_time差值小于50秒的记录
-        保留时间最早的记录
+        从月度归档表按时间倒序读取 die_point，供回测使用
         """
-        from datetime import timedelta
+        from models.archive import archive_tables
 
-        async with async_session_maker() as session, session.begin():
-            # 获取所有记录按create_time排序
-            stmt = select(cls.id, cls.create_time).order_by(cls.create_time)
-            records = (await session.execute(stmt)).all()
+        data = []
+        for table in reversed(await archive_tables(cls.__table__)):
+            async with async_session_maker() as session, session.begin():
+                stmt = (
+                    select(table.c.die_point)
+                    .where(table.c.website == website)
+                    .order_by(desc(table.c.create_time))
+                    .limit(limit - len(data))
+                )
+                data.extend((await session.execute(stmt)).scalars().all())
+            if len(data) >= limit:
+                break
+        return data
 
-            if len(records) < 2:
-                return  # 记录不足无需处理
+    @classmethod
+    async def remove_duplicate_records(cls) -> int:
+        """
+        删除与上条保留记录create_time差值小于50秒的记录（按站点分别处理）
+        保留时间最早的记录
+
+        按 (create_time, id) 游标分批读取，每批只删除本批找出的重复 id，
+        内存占用和 SQL 参数个数都不超过 DEDUPE_CHUNK_SIZE
+
+        返回:
+            int: 删除的记录数
+        """
+        async with async_session_maker() as session, session.begin():
+            websites = (await session.execute(select(cls.website).distinct())).scalars().all()
 
-            # 找出要保留的记录ID（时间差>=50秒的记录）
-            keep_ids = [records[0].id]  # 保留第一条
-            prev_time = records[0].create_time
+        removed = 0
+        for website in websites:
+            prev_time = None
+            cursor = None
+            while True:
+                async with async_session_maker() as session, session.begin():
+                    stmt = (
+                        select(cls.id, cls.create_time)
+                        .where(cls.website == website)
+                        .order_by(cls.create_time, cls.id)
+                        .limit(DEDUPE_CHUNK_SIZE)
+                    )
+                    if cursor is not None:
+                        stmt = stmt.where(tuple_(cls.create_time, cls.id) > cursor)
+                    records = (await session.execute(stmt)).all()
+                    if not records:
+                        break
 
-            for record in records[1:]:
-                if (record.create_time - prev_time) >= timedelta(seconds=50):
-                    keep_ids.append(record.id)
-                    prev_time = record.create_time
+                    duplicate_ids = []
+                    for record in records:
+                        if prev_time is None or record.create_time - prev_time >= ROUND_WINDOW:
+                            prev_time = record.create_time
+                        else:
+                            duplicate_ids.append(record.id)
+                    cursor = (records[-1].create_time, records[-1].id)
 
-            # 删除不在保留列表中的记录
-            stmt = delete(cls).where(cls.id.not_in(keep_ids))
-            await session.execute(stmt)
+                    if duplicate_ids:
+                        await session.execute(delete(cls).where(cls.id.in_(duplicate_ids)))
+                        removed += len(duplicate_ids)
+        if removed:
+            logger.info(f"ydx 去重删除 {removed} 条重复记录")
+        return removed
 
 
-def make_MACD(datas: pd.DataFrame, short=12, long=26, mid=9):
+def make_MACD(datas: "pd.DataFrame", short=12, long=26, mid=9):
     ema1 = datas["close"].ewm((short - 1) / 2, adjust=False).mean()
     ema2 = datas["close"].ewm((long - 1) / 2, adjust=False).mean()
     dif = ema1 - ema2
@@ -169,7 +240,7 @@ def make_MACD(datas: pd.DataFrame, short=12, long=26, mid=9):
     return macd
 
 
-def make_KDJ(datas: pd.DataFrame, days=9, kn=3, dn=3):
+def make_KDJ(datas: "pd.DataFrame", days=9, kn=3, dn=3):
     lowest = datas["low"].rolling(days).min()
     lowest = lowest.fillna(datas["low"].expanding().min())
     highest = datas["high"].rolling(days).max()
@@ -12,11 +12,15 @@ scheduler = AsyncIOScheduler()
 from .zhuque.fireGenshinCharacterMagic import zhuque_autofire_firsttimeget
 from .universal.auto_changename import auto_changename_temp
 from .universal.ourbits import ourbits_send_msg
+from .universal.archive_rows import archive_rows_start
+from .universal.emby_index import emby_index_start
 
 scheduler_jobs = {
     "autofire": zhuque_autofire_firsttimeget,
     "autochangename": auto_changename_temp,
-    "ourbits_send_msg": ourbits_send_msg
+    "ourbits_send_msg": ourbits_send_msg,
+    "archive": archive_rows_start,
+    "embyindex": emby_index_start,
 }
 
 async def start_scheduler():    
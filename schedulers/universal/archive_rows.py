@@ -0,0 +1,42 @@
+# 自定义模块
+from libs.log import logger
+from libs.notify import CRITICAL, notify
+from libs.state import state_manager
+from models.archive import archive_old_rows
+from schedulers import scheduler
+
+
+SITE_NAME = "ARCHIVE"
+
+
+async def archive_rows_action():
+    """
+    归档早于 horizon_days 天的 transform / redpocket / zhuque_ydx 记录
+    """
+    horizon_days = int(state_manager.get_item(SITE_NAME, "horizon_days", 180))
+    try:
+        result = await archive_old_rows(horizon_days)
+    except Exception as e:
+        logger.exception(f"数据归档失败: {e}")
+        await notify(f"❌ 数据归档失败: {e}", level=CRITICAL)
+        return
+    if any(result.values()):
+        detail = "\n".join(f"{table}: {count} 行" for table, count in result.items())
+        await notify(f"已归档 {horizon_days} 天前的记录：\n{detail}", topic="archive")
+
+
+async def archive_rows_start():
+    """
+    在低峰时段（默认每天 04:30）执行数据归档
+    """
+    hour = state_manager.get_item(SITE_NAME, "hour", "4")
+    minute = state_manager.get_item(SITE_NAME, "minute", "30")
+    scheduler.add_job(
+        archive_rows_action,
+        "cron",
+        hour=hour,
+        minute=minute,
+        id="archive",
+        replace_existing=True,
+    )
+    logger.info(f"数据归档任务已启用，每天 {hour}:{minute} 执行")
@@ -0,0 +1,34 @@
+# 标准库
+from datetime import datetime
+
+# 自定义模块
+from libs.emby_index import SITE_NAME, emby_index
+from libs.log import logger
+from libs.state import state_manager
+from schedulers import scheduler
+
+
+async def emby_index_refresh():
+    """
+    增量同步 Emby 媒体库索引
+    """
+    try:
+        await emby_index.refresh()
+    except Exception as e:
+        logger.error(f"Emby 索引同步失败: {e}")
+
+
+async def emby_index_start():
+    """
+    每隔 index_interval 分钟（默认 30）同步一次，启用时立即同步一次（不阻塞启动）
+    """
+    interval = int(state_manager.get_item(SITE_NAME, "index_interval", 30))
+    scheduler.add_job(
+        emby_index_refresh,
+        "interval",
+        minutes=interval,
+        id="embyindex",
+        next_run_time=datetime.now(),
+        replace_existing=True,
+    )
+    logger.info(f"Emby 索引同步任务已启用，每 {interval} 分钟执行")
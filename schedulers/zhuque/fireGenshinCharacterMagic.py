@@ -8,10 +8,10 @@ import aiohttp
 
 # 自定义模块
 from libs.log import logger
+from libs.notify import notify
 from libs.state import state_manager
 from models.redpocket_db_modle import Redpocket
 from schedulers import scheduler
-from config.config import PT_GROUP_ID
 
 
 
@@ -79,8 +79,6 @@ async def zhuque_autofire_firsttimeget():
 
 
 async def zhuque_autofire():
-    from app import get_bot_app
-    bot_app = get_bot_app()
     now = datetime.now()
     try:
         result1 = await fireGenshinCharacterMagic()
@@ -99,7 +97,7 @@ async def zhuque_autofire():
                 f"释放成功：共得 {total_bonus} 灵石，下次时间：{next_time.isoformat()}"
             )
             await Redpocket.add_redpocket_record(SITE_NAME, "firegenshin", total_bonus)
-            await bot_app.send_message(PT_GROUP_ID["BOT_MESSAGE_CHAT"], f"{now.replace(microsecond=0)} {SITE_NAME} 释放获得 {total_bonus} {BONUS_NAME} " )            
+            await notify(f"{now.replace(microsecond=0)} {SITE_NAME} 释放获得 {total_bonus} {BONUS_NAME}", topic="bonus")            
             
         else:
             next_time = now + timedelta(minutes=15)
@@ -0,0 +1,80 @@
+# 标准库
+import asyncio
+from types import SimpleNamespace
+
+# 第三方库
+import pytest
+
+# 自定义模块
+from libs.prune import parse_count, prune_own_messages
+
+
+def test_parse_count_positive():
+    assert parse_count("1") == 1
+    assert parse_count("250") == 250
+
+
+def test_parse_count_all_is_unlimited():
+    assert parse_count("all") == 0
+
+
+@pytest.mark.parametrize("arg", ["0", "00", "-1", "abc", ""])
+def test_parse_count_rejects_non_positive(arg):
+    # ,dme 0 不能被当成不限数量而删除全部消息
+    with pytest.raises(ValueError):
+        parse_count(arg)
+
+
+class FakeClient:
+    """
+    按 offset 翻页的 search_messages（与 pyrogram 一致），delete_messages 会缩短搜索结果
+    """
+
+    def __init__(self, message_ids):
+        self.message_ids = set(message_ids)
+        self.deleted = []
+
+    async def search_messages(self, chat_id, from_user=None, min_date=None, max_date=None, max_id=0, limit=0, offset=0):
+        total = limit or (1 << 31) - 1
+        current = 0
+        while True:
+            found = sorted((i for i in self.message_ids if not max_id or i < max_id), reverse=True)
+            page = found[offset:offset + min(100, total)]
+            if not page:
+                return
+            offset += len(page)
+            for message_id in page:
+                # 让删除任务在翻页途中执行
+                await asyncio.sleep(0)
+                yield SimpleNamespace(id=message_id)
+                current += 1
+                if current >= total:
+                    return
+
+    async def delete_messages(self, chat_id, message_ids):
+        await asyncio.sleep(0)
+        self.message_ids.difference_update(message_ids)
+        self.deleted.extend(message_ids)
+        return len(message_ids)
+
+
+def test_prune_deletes_every_page():
+    client = FakeClient(range(1, 451))
+    found, deleted = asyncio.run(prune_own_messages(client, 1))
+    assert (found, deleted) == (450, 450)
+    assert not client.message_ids
+    assert sorted(client.deleted) == list(range(1, 451))
+
+
+def test_prune_respects_count_and_max_id():
+    client = FakeClient(range(1, 451))
+    found, deleted = asyncio.run(prune_own_messages(client, 1, count=150, max_id=400))
+    assert (found, deleted) == (150, 150)
+    assert sorted(client.deleted) == list(range(250, 400))
+
+
+def test_prune_dry_run_deletes_nothing():
+    client = FakeClient(range(1, 251))
+    found, deleted = asyncio.run(prune_own_messages(client, 1, dry_run=True))
+    assert (found, deleted) == (250, 0)
+    assert len(client.message_ids) == 250
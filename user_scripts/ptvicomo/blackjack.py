@@ -1,6 +1,4 @@
 import asyncio
-from copy import deepcopy
-import random
 import re
 from pyrogram import Client
 from pyrogram.types import Message
@@ -9,6 +7,8 @@ from filters import custom_filters
 from app import Client
 import logging
 
+from libs.blackjack import benchmark, solver_cache
+from libs.lazy_import import ensure_loaded
 from libs.others import delete_message
 
 logger = logging.getLogger("main")
@@ -19,138 +19,8 @@ MAX_BONUS = 100000
 MAX_LOSE_TIME = 0
 lose_time = 0
 AUTO = False
-ALL_CARDS = [
-    f"{rank}{suit}"
-    for rank in [
-        "2",
-        "3",
-        "4",
-        "5",
-        "6",
-        "7",
-        "8",
-        "9",
-        "10",
-        "J",
-        "Q",
-        "K",
-        "A",
-    ]
-    for suit in ["♠", "♥", "♦", "♣"]
-]
-
-
-class Deck:
-    def __init__(self, dealer_cards: list[str], player_cards: list[str]):
-        self.dealer_hand = deepcopy(dealer_cards)
-        self.player_hand = deepcopy(player_cards)
-        self.shuffle_card()
-        while (card := self.guess_dealer_first_card()) == False:
-            self.shuffle_card()
-        self.dealer_hand = [card] + self.dealer_hand
-        while self.dealer_hand_value() < 17:
-            self.dealer_draw()
-        logger.debug(f"dealer:{self.dealer_hand}")
-        self.dealer_value = self.dealer_hand_value()
-
-    def shuffle_card(self):
-        self.cards = deepcopy(ALL_CARDS)
-        for card in self.dealer_hand + self.player_hand:
-            self.cards.remove(card)
-        random.shuffle(self.cards)
-
-    def guess_dealer_first_card(self):
-        card = self.cards[-1]
-        if len(self.dealer_hand) > 1:
-            if self.calculate_hand_value([card] + self.dealer_hand[:-1]) > 16:
-                return False
-        if len(self.player_hand) - len(self.dealer_hand) > 1:
-            if self.calculate_hand_value([card] + self.dealer_hand) < 17:
-                return False
-        self.cards.remove(card)
-        return card
-
-    def add(self):
-        sub_0 = -1
-        self.player_draw()
-        while ((sub := self.calculate_result()) < 1) and (
-            self.calculate_hand_value(self.player_hand) < 21
-        ):
-            if sub == 0:
-                sub_0 = sub
-            self.player_draw()
-        logger.debug(f"player{self.player_hand}")
-        return max(self.calculate_result(), sub_0)
-
-    def draw_card(self):
-        if self.cards:
-            return self.cards.pop()
-        else:
-            return None
-
-    def dealer_draw(self):
-        card = self.draw_card()
-        if card:
-            self.dealer_hand.append(card)
-        return card
-
-    def player_draw(self):
-        card = self.draw_card()
-        if card:
-            self.player_hand.append(card)
-        return card
-
-    def calculate_hand_value(self, hand):
-        value = 0
-        aces = 0
-        for card in hand:
-            rank = card[:-1]
-            if rank in ["J", "Q", "K"]:
-                value += 10
-            elif rank == "A":
-                aces += 1
-                value += 11
-            else:
-                value += int(rank)
-
-        while value > 21 and aces:
-            value -= 10
-            aces -= 1
-
-        return value
-
-    def dealer_hand_value(self):
-        return self.calculate_hand_value(self.dealer_hand)
-
-    def player_hand_value(self):
-        return self.calculate_hand_value(self.player_hand)
-
-    def calculate_result(self):
-        dealer_value = self.dealer_value
-        player_value = self.player_hand_value()
-        if player_value == dealer_value:
-            if player_value == 21:
-                if len(self.player_hand) == 2 and len(self.dealer_hand) == 2:
-                    return 0
-                elif len(self.player_hand) == 2:
-                    return 1
-                elif len(self.dealer_hand) == 2:
-                    return -1
-            return 0
-        elif player_value > 21 and dealer_value > 21:
-            if len(self.dealer_hand)>len(self.player_hand):
-                return -1
-            return 0
-        elif player_value > 21:
-            return -1
-        elif dealer_value > 21:
-            return 1
-        elif player_value > dealer_value:
-            return 1
-        elif player_value < dealer_value:
-            return -1
-        else:
-            return 0
+# 最近一手牌，供 /xd21 bench 使用
+last_hand = (["7♠"], ["10♥", "6♦"])
 
 
 @Client.on_message(
@@ -167,15 +37,15 @@ async def blackjack(client: Client, message: Message):
     dealer_cards = match.group(1).split(" ")
     player_cards = match.group(2).split(" ")
 
-    add_value = 0
-    done_value = 0
-    total_simulations = 1000
+    global last_hand
+    last_hand = (dealer_cards, player_cards)
 
-    for _ in range(total_simulations):
-        deck = Deck(dealer_cards, player_cards)
-        done_value += deck.calculate_result()
-        add_value += deck.add()
-    logger.info(f"{add_value}:{done_value}")
+    # 精确解，已缓存的局面直接返回
+    ensure_loaded("numpy")
+    add_value, done_value = await asyncio.to_thread(
+        solver_cache.get, dealer_cards, player_cards
+    )
+    logger.info(f"{add_value:+.4f}:{done_value:+.4f}")
     await asyncio.sleep(1)
     if add_value >= done_value:
         await client.request_callback_answer(message.chat.id, message.id, "add")
@@ -187,20 +57,25 @@ async def blackjack(client: Client, message: Message):
 async def xd21(client: Client, message: Message):
     global AUTO, MAX_BONUS, MAX_LOSE_TIME
 
-    if message.command[1] == "on":
+    if message.command[1] == "bench":
+        await message.edit("21点模拟基准测试中...")
+        ensure_loaded("numpy")
+        report = await asyncio.to_thread(benchmark, *last_hand)
+        await message.edit(f"```\n{report}\n```")
+    elif message.command[1] == "on":
         AUTO = True
         MAX_BONUS = int(message.command[2]) if len(message.command) > 2 else MAX_BONUS
         MAX_LOSE_TIME = (
             int(message.command[3]) if len(message.command) > 3 else MAX_LOSE_TIME
         )
-        delete_message(await message.edit("21点启动"), 5)
+        await delete_message(await message.edit("21点启动"), 5)
         await client.send_message(
             message.chat.id,
             f"/blackjack@PTVicomoBot {int(MAX_BONUS/(2**MAX_LOSE_TIME))}",
         )
     else:
         AUTO = False
-        delete_message(await message.edit("21点关闭"), 5)
+        await delete_message(await message.edit("21点关闭"), 5)
 
 
 @Client.on_message(
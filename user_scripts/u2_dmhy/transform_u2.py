@@ -4,7 +4,6 @@ from datetime import datetime, timedelta
 
 # 第三方库
 import requests
-from bs4 import BeautifulSoup
 from pyrogram import filters, Client
 from pyrogram.types import Message
 
@@ -48,6 +47,8 @@ async def u2_dmhy_gift(recv_ID,amount,message):
         # 发起请求
         with requests.post(url, headers=headers, data=data) as response:
             if response.status_code == 200:
+                from bs4 import BeautifulSoup
+
                 soup = BeautifulSoup(response.text, "lxml")
                 result1 = soup.select_one("h2")
                 if result1:
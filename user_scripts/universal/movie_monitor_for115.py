@@ -1,6 +1,7 @@
 # 标准库
 import re
 import json
+import asyncio
 import shutil
 from pathlib import Path
 from typing import List, Optional
@@ -14,8 +15,13 @@ from pyrogram.types.messages_and_media import Message
 # 自定义模块
 from app import get_bot_app
 from config.config import proxy_set, PT_GROUP_ID
+from libs.caption_parser import MediaInfo, blockword_matcher, parse_pan115_caption, parse_title_year_caption
+from libs.emby_index import emby_index
 from libs.log import logger
+from libs.seen_index import seen_index, title_key
 from libs.state import state_manager
+from libs.tmdb_cache import tmdb_cache
+from libs.work_queue import share115_queue
 
 
 SITE_NAME = "SHARE115TOCMS"
@@ -24,6 +30,9 @@ media_path = Path("temp_file/get_media")
 
 
 LINK_PATTERN = re.compile(r"https://115cdn\.com/s/[^\s]+")  # 匹配 115 链接
+# TMDB / Emby 网络错误的重试次数
+NETWORK_RETRIES = 3
+NETWORK_ERRORS = (aiohttp.ClientError, TimeoutError)
 TARGET = {
     
     "CHANNEL_SHARES_115_ID":-1002188663986,
@@ -31,6 +40,13 @@ TARGET = {
     "PAN115_SHARE_ID":-1002343015438,
     "GUAGUALE115_ID": -1002245898899
 }
+# 各频道的标题解析器
+CAPTION_PARSERS = {
+    TARGET["CHANNEL_SHARES_115_ID"]: parse_title_year_caption,
+    TARGET["GUAGUALE115_ID"]: parse_title_year_caption,
+    TARGET["TEST_CHAT_ID"]: parse_title_year_caption,
+    TARGET["PAN115_SHARE_ID"]: parse_pan115_caption,
+}
      
 # ================== TMDB API 类 ==================
 class TmdbApi:
@@ -57,9 +73,14 @@ class TmdbApi:
     async def search_all(self, title: str, year: str = None) -> List[dict]:
         """
         异步搜索电影和电视剧，返回带有类型字段的结果
+        相同 (标题, 年份, 语言) 的结果从 tmdb_cache 读取，并发的相同查询只请求一次
         """
-        movie_results = await self.search_movies(title, year)
-        tv_results = await self.search_tv(title, year)
+        return await tmdb_cache.get(title, year, self.language, lambda: self._search_all(title, year))
+
+    async def _search_all(self, title: str, year: str = None) -> List[dict]:
+        movie_results, tv_results = await asyncio.gather(
+            self.search_movies(title, year), self.search_tv(title, year)
+        )
         for result in movie_results:
             result["media_type"] = "movie"
         for result in tv_results:
@@ -90,9 +111,10 @@ class TmdbApi:
                     response.raise_for_status()
                     data = await response.json()
                     return data.get('results', [])
-        except aiohttp.ClientError as e:
-            logger.error(f"TMDB Movie API 错误: {str(e)}")
-            return []
+        except (aiohttp.ClientError, TimeoutError) as e:
+            # 网络错误交给处理队列重试，也不会被当作无结果写入缓存
+            logger.warning(f"TMDB Movie API 错误: {e!r}")
+            raise
         except Exception as e:
             logger.error(f"其他错误: {str(e)}")
             return []
@@ -119,9 +141,10 @@ class TmdbApi:
                     response.raise_for_status()
                     data = await response.json()
                     return data.get('results', [])
-        except aiohttp.ClientError as e:
-            logger.error(f"TMDB TV API 错误: {str(e)}")
-            return []
+        except (aiohttp.ClientError, TimeoutError) as e:
+            # 网络错误交给处理队列重试，也不会被当作无结果写入缓存
+            logger.warning(f"TMDB TV API 错误: {e!r}")
+            raise
         except Exception as e:
             logger.error(f"其他错误: {str(e)}")
             return []
@@ -154,16 +177,11 @@ async def get_movies(title: str, year: Optional[str] = None, media_type: Optiona
     embyserver = state_manager.get_item(SITE_NAME.upper(),"embyserver","")
     embyapi = state_manager.get_item(SITE_NAME.upper(),"embyapi","")
 
-    if media_type.lower() == "movie":
-        media_type = "media_type"
-    elif media_type.lower == "tv":
-        media_type = "Series"
-    else:
-        media_type = None
+    media_type = {"movie": "Movie", "tv": "Series"}.get((media_type or "").lower(), "Movie,Series")
 
     url = f"{embyserver}emby/Items"
     params = {
-        "IncludeItemTypes": f"{media_type}",
+        "IncludeItemTypes": media_type,
         "Fields": "ProviderIds,OriginalTitle,ProductionYear,Path,UserDataPlayCount,UserDataLastPlayedDate,ParentId",
         "StartIndex": 0,
         "Recursive": "true",
@@ -175,7 +193,7 @@ async def get_movies(title: str, year: Optional[str] = None, media_type: Optiona
 
     try:
         # 使用 aiohttp 异步请求
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(timeout=ClientTimeout(total=10)) as session:
             async with session.get(url, params=params) as response:
                 res = await response.json()                     
                 if res:
@@ -188,6 +206,9 @@ async def get_movies(title: str, year: Optional[str] = None, media_type: Optiona
                         return []
                 else:
                     return []                    
+    except (aiohttp.ClientError, TimeoutError):
+        # 连不上 Emby 时不能当作“库中没有”，交给处理队列重试
+        raise
     except Exception as e:
         logger.error(f"连接Items出错：" + str(e))
         return []
@@ -205,14 +226,20 @@ async def extract_115_links(message: Message) -> List[str]:
 
 async def send_115_links(client:Client, message, title, year):
     """
-    提取并发送 115 链接
+    提取并发送 115 链接，已转发过的链接不再发送
     """
     cmsbot = state_manager.get_item(SITE_NAME.upper(),"cmsbot","")
     links = await extract_115_links(message)
     if links:
+        sent = []
         for link in links:
+            if await seen_index.seen_link(link):
+                logger.info(f"链接已转发过，跳过: {link}")
+                continue
             await client.send_message(cmsbot, link)
+            sent.append(link)
             logger.info(f"已发送媒体: [标题: {title}, 年份: {year}] 链接: {link}")
+        await seen_index.mark(sent, title, year)
     else:
         logger.warning("未找到 115 链接。")        
 
@@ -222,7 +249,9 @@ async def search_and_send_message(client: Client, title, year, complete_series,
         return
 
     tmdb_api = TmdbApi()
-    results = await tmdb_api.search_all(title, year)
+    results = await share115_queue.run_stage(
+        "tmdb", tmdb_api.search_all, title, year, retries=NETWORK_RETRIES, retry_on=NETWORK_ERRORS
+    )
 
     if not results:
         logger.info(f"❌ TMDB 无搜索结果 | Title: {title}, Year: {year}")
@@ -254,13 +283,18 @@ async def search_and_send_message(client: Client, title, year, complete_series,
     # 内部方法封装：检查 Emby 是否已有，未有则推送链接
     async def check_and_send():
         try:
-            print(title,year)
-            tmdb_list = await get_movies(title=title, year=year, media_type=tmdb_media_type)
-            print("tmdb_list",tmdb_list)
+            # 先查本地索引，未命中再实时查询 Emby（覆盖上次同步之后入库的条目）
+            if emby_index.contains(tmdb_media_type, tmdb_id):
+                logger.info(f"已存在于媒体库 | Title: {title}, TMDB ID: {tmdb_id}")
+                return
+            tmdb_list = await share115_queue.run_stage(
+                "emby", get_movies, title, year, tmdb_media_type, retries=NETWORK_RETRIES, retry_on=NETWORK_ERRORS
+            )
             if tmdb_list and str(tmdb_id) in tmdb_list:
+                emby_index.add(tmdb_media_type, tmdb_id)
                 logger.info(f"已存在于媒体库 | Title: {title}, TMDB ID: {tmdb_id}")
             else:
-                await send_115_links(client, message, title, year)
+                await share115_queue.run_stage("cms", send_115_links, client, message, title, year)
         except Exception as e:
             logger.error(f"获取媒体信息失败 | Title: {title}, Error: {e}")
 
@@ -279,74 +313,41 @@ async def search_and_send_message(client: Client, title, year, complete_series,
 
 
 
+async def process_share(client: Client, media: MediaInfo, message: Message):
+    """
+    处理队列中的一条分享：去重后检索 TMDB / Emby，需要时转发给 CMS
+    """
+    title, year = media.title, media.year
+    if await seen_index.should_skip(LINK_PATTERN.findall(message.caption or ""), title, year):
+        logger.info(f"检索到群组: [{message.chat.title}] 媒体信息: {title} {year} 已转发过,不开始检索")
+        return
+    logger.info(f"检索到群组: [{message.chat.title}] 媒体信息: {title} {year}")
+    await search_and_send_message(client, title, year, media.complete, message)
+
+
 @Client.on_message(
         filters.chat(list(TARGET.values()))
         & filters.regex(r"https://115cdn\.com/s/[^\s]+")
     )
 async def monitor_channels(client: Client, message: Message):
-    """监控频道消息，提取并转发 115 链接。"""
+    """监控频道消息，解析标题后放入处理队列，检索与转发由 share115_queue 完成"""
     
     shareswitch = state_manager.get_item(SITE_NAME.upper(),"shareswitch","off")
-    
-    title = ""
     if shareswitch != "on":
         return
-    
-    blockyword_list = state_manager.get_item(SITE_NAME.upper(),"blockyword_list",[])
-
- 
-    if (message.chat.id == TARGET["CHANNEL_SHARES_115_ID"]
-        or message.chat.id == TARGET["GUAGUALE115_ID"]
-        or message.chat.id == TARGET["TEST_CHAT_ID"]):
-        match = None
-        caption = message.caption or "" 
-        match = re.search(r"(.*?)\s*\((\d+)\)", caption)         
-        if match:
-            title = match.group(1).strip()  # 括号前的内容
-            year = match.group(2).strip() 
-            if ("EP" not in caption and "全" in caption) or "完结" in caption:
-                complete_series = True
-            else:
-                complete_series = False
-
-              
-        
-    elif message.chat.id == TARGET["PAN115_SHARE_ID"]:
-        
-        size_match = None
-        title_year_match = None
-        complete_series = False
-        caption = message.caption or "" 
-        unit_map = {'M': 1, 'G': 1024, 'T': 1024**2}
-        if "】" in message.caption:
-            title_year_pattern = r"[】](.*?)\s*\((\d+)\)"
-        else:  # 如果没有【】，从:后匹配
-            title_year_pattern = r"[:] (.*?)\s*\((\d+)\)"
-
-        title_year_match = re.search(title_year_pattern, caption)
 
+    parser = CAPTION_PARSERS.get(message.chat.id)
+    media = parser(message.caption or "") if parser else None
+    if not media or not media.title:
+        return
 
-        size_pattern = r"大\s*小[：:]\s*([\d.]+)\s*([TGM])"
-        size_match = re.search(size_pattern, caption)        
-       
-        if title_year_match:
-            title = title_year_match.group(1).strip()  # 括号前的内容
-            year = title_year_match.group(2).strip()
-
-        if size_match:            
-            size_value = size_match.group(1)  # 如 '1.02'
-            size_unit = size_match.group(2)   # 如 'G'
-            size_mb = float(size_value) * unit_map[size_unit]
-            if size_mb >= 10240 and "第" not in caption:
-                complete_series = True
-            else:
-                complete_series = False
-    if title and year:        
-        if any(word in title for word in blockyword_list):
-            logger.info(f"检索到群组: [{message.chat.title}] 媒体信息: {title} {year} 是屏蔽关键字,不开始检索") 
-        else:
-            logger.info(f"检索到群组: [{message.chat.title}] 媒体信息: {title} {year}")
-            await search_and_send_message(client,title, year,complete_series ,message)
+    if blockword_matcher.match(media.title):
+        logger.info(f"检索到群组: [{message.chat.title}] 媒体信息: {media.title} {media.year} 是屏蔽关键字,不开始检索")
+        return
+    share115_queue.submit(
+        process_share, client, media, message,
+        key=title_key(media.title, media.year), name=f"{media.title} ({media.year})",
+    )
 
 
 
@@ -369,7 +370,11 @@ async def getmedia(client: Client, message: Message):
         return
 
     tmdb_api = TmdbApi()
-    result_mess = await tmdb_api.search_all(title, year)
+    try:
+        result_mess = await tmdb_api.search_all(title, year)
+    except (aiohttp.ClientError, TimeoutError) as e:
+        await message.edit(f"TMDB 查询失败: {e!r}")
+        return
     
     file_path = media_path / f"{title}({year}).txt"
     with open(file_path, "w", encoding="utf-8") as f:
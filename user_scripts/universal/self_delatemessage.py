@@ -1,15 +1,24 @@
 # 标准库
-import asyncio
-import contextlib
+from datetime import timedelta
 
 # 第三方库
 from pyrogram import filters, Client
 from pyrogram.types import Message
 
+# 自定义模块
+from libs import others
+from libs.prune import PruneProgress, parse_count, prune_own_messages
+
 """
 删除自己所发的消息
 """
 
+USAGE = (
+    "命令格式: ,dme 数量 [since=YYYY-MM-DD] [until=YYYY-MM-DD] [dry]\n"
+    "数量为正整数，为 all 时删除范围内全部消息；回复某条消息时只删除该条及更早的消息；dry 只统计不删除"
+)
+
+
 @Client.on_message(
         filters.me
         & filters.command("dme", prefixes=",")
@@ -17,45 +26,50 @@ from pyrogram.types import Message
 
 async def self_delatemessage(client: Client, message: Message):
     """Deletes specific amount of messages you sent."""
-    msgs = []
-    count_buffer = 0
-    offset = 0
-    if len(message.command) != 2:
-        if not message.reply_to_message:
-            return await message.edit(f"命令格式不对请输入/dme number")
-        offset = message.reply_to_message.id
+    count = None
+    min_date = max_date = None
+    dry_run = False
     try:
-        count = int(message.command[1])
-        await message.delete()
+        for arg in message.command[1:]:
+            if arg.isdigit() or arg == "all":
+                count = parse_count(arg)
+            elif arg == "dry":
+                dry_run = True
+            elif arg.startswith("since="):
+                min_date = others.parse_date_input(arg[6:])
+            elif arg.startswith("until="):
+                max_date = others.parse_date_input(arg[6:]) + timedelta(days=1)
+            else:
+                raise ValueError(arg)
     except ValueError:
-        await message.edit(f"删除数量错误 请输出正整数")
-        return
-    async for msg in client.get_chat_history(message.chat.id, limit=100):
-        if count_buffer == count:
-            break
-        if msg.from_user and msg.from_user.is_self:
-            msgs.append(msg.id)
-            count_buffer += 1
-            if len(msgs) == 100:
-                await client.delete_messages(message.chat.id, msgs)
-                msgs = []
-    async for msg in client.search_messages(
-        message.chat.id, from_user="me", offset=offset
-    ):
-        if count_buffer == count:
-            break
-        msgs.append(msg.id)
-        count_buffer += 1
-        if len(msgs) == 100:
-            await client.delete_messages(message.chat.id, msgs)
-            msgs = []
-    if msgs:
-        await client.delete_messages(message.chat.id, msgs)   
-
-    with contextlib.suppress(ValueError):
-        notification = await send_prune_notify(client, message, count_buffer, count)
-        await asyncio.sleep(1)
-        await notification.delete()
-
-async def send_prune_notify(client: Client, message: Message, count_buffer, count):
-    return await message.reply(f"已删除消息{str(count_buffer)} / {str(count)}")
\ No newline at end of file
+        return await message.edit(f"参数错误\n{USAGE}")
+    if count is None:
+        return await message.edit(USAGE)
+
+    # 只搜索命令之前（或被回复消息及之前）的消息，命令本身用来显示进度
+    max_id = message.reply_to_message.id + 1 if message.reply_to_message else message.id
+    title = "统计" if dry_run else "删除"
+
+    async def show_progress(found: int, deleted: int):
+        text = f"正在{title}自己的消息: 已找到 {found}"
+        if not dry_run:
+            text += f"，已删除 {deleted}"
+        await message.edit(text)
+
+    found, deleted = await prune_own_messages(
+        client,
+        message.chat.id,
+        count=count,
+        min_date=min_date,
+        max_date=max_date,
+        max_id=max_id,
+        dry_run=dry_run,
+        progress=PruneProgress(show_progress),
+    )
+    await send_prune_notify(client, message, found if dry_run else deleted, count or found, dry_run)
+    await others.delete_message(message, 3 if not dry_run else 15)
+
+async def send_prune_notify(client: Client, message: Message, count_buffer, count, dry_run=False):
+    if dry_run:
+        return await message.edit(f"共找到可删除消息 {count_buffer} 条（未删除）")
+    return await message.edit(f"已删除消息{str(count_buffer)} / {str(count)}")
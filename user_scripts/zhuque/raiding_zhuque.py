@@ -2,7 +2,6 @@
 import re
 from decimal import Decimal
 from random import random
-from datetime import datetime, timedelta
 
 # 第三方库
 from pyrogram import filters, Client
@@ -13,14 +12,18 @@ from config.reply_message import ZQ_REPLY_MESSAGE
 from filters import custom_filters
 from libs import others
 from libs.log import logger
+from libs.message_cache import MessageCache
+from libs.raid_cooldown import raid_cooldown
 from libs.state import state_manager
-from models.transform_db_modle import User, Raiding
+from models.transform_db_modle import User
 
 
 
 TARGET = [-1001833464786, -1002262543959, -1002522450068]
 SITE_NAME = "zhuque"
 BONUS_NAME = "灵石"
+# 自己 /dajie 回复的目标消息，打劫结果到达时据此记录对方
+raid_targets = MessageCache()
 
 
 def extract_lingshi_amount(text: str, pattern: str) -> Decimal | None:
@@ -30,6 +33,17 @@ def extract_lingshi_amount(text: str, pattern: str) -> Decimal | None:
     return None
 
 
+@Client.on_message(filters.chat(TARGET) & filters.me & filters.regex(r"^/dajie"), group=1)
+async def zhuque_dajie_sent(client: Client, message: Message):
+    """
+    缓存在其他设备上手动发出的 /dajie 所回复的消息
+
+    本账号 RPC 返回的消息不会进入处理器，自动反打发出的 /dajie 在 zhuque_dajie_fanda 中直接缓存
+    """
+    if message.reply_to_message:
+        raid_targets.put(message.reply_to_message)
+
+
 @Client.on_message(
     filters.chat(TARGET)
     & custom_filters.reply_to_me
@@ -39,7 +53,9 @@ def extract_lingshi_amount(text: str, pattern: str) -> Decimal | None:
 async def zhuque_dajie_Raiding(client: Client, message: Message):
 
     raiding_msg = message.reply_to_message
-    raiding_msg_to = await client.get_messages(raiding_msg.chat.id, message_ids=raiding_msg.reply_to_message_id)
+    raiding_msg_to = raid_targets.get(raiding_msg.chat.id, raiding_msg.reply_to_message_id)
+    if raiding_msg_to is None:
+        raiding_msg_to = await client.get_messages(raiding_msg.chat.id, message_ids=raiding_msg.reply_to_message_id)
     raidcount_match = re.search(r"^/dajie[\s\S]*\s(\d+)", raiding_msg.text or "")
     raidcount = int(raidcount_match.group(1)) if raidcount_match else 1
 
@@ -126,7 +142,7 @@ async def zhuque_dajie_fanda(raidcount: int, message: Message):
         await record_raiding("beraided", -lose_amt, raidcount, raiding_msg)
 
     # 计算打劫冷却
-    cd_ready = await dajie_cdtime_Calculate()
+    cd_ready = dajie_cdtime_Calculate()
 
     # 判断是否触发自动反打逻辑
     if win_amt or lose_amt:
@@ -144,6 +160,7 @@ async def zhuque_dajie_fanda(raidcount: int, message: Message):
             if not cd_ready:
                 reply = await raiding_msg.reply(ZQ_REPLY_MESSAGE["robbedByLoseCD"])
             elif amount >= 2000:
+                raid_targets.put(raiding_msg)
                 reply = await raiding_msg.reply(
                     f"/dajie {raidcount} {ZQ_REPLY_MESSAGE[message_key]}"
                 )
@@ -185,8 +202,9 @@ async def zhuque_dajie_fanda(raidcount: int, message: Message):
 
 async def record_raiding(action: str, amount: Decimal, count: int, message: Message):
     """
-    打劫金额写入数据库
+    打劫金额写入数据库，同时更新打劫冷却
     """
+    raid_cooldown.record(SITE_NAME, action, count)
     try:
         user = await User.get(message)
         await user.add_raiding_record(SITE_NAME, action, count, amount)
@@ -194,16 +212,8 @@ async def record_raiding(action: str, amount: Decimal, count: int, message: Mess
         logger.exception(f"提交失败: 用户消息, 错误：{e}")
 
 
-async def dajie_cdtime_Calculate() -> bool:
+def dajie_cdtime_Calculate() -> bool:
     """
-    打劫CD时间计算
+    打劫CD时间计算，冷却时间为最近一次打劫的次数（分钟），由 raid_cooldown 在内存中维护
     """
-    now = datetime.now()
-    try:
-        last_time, raid_cd = await Raiding.get_latest_raiding_createtime(
-            SITE_NAME, "raiding"
-        )
-        return (now - last_time) >= timedelta(minutes=float(raid_cd))
-    except Exception as e:
-        logger.exception(f"冷却时间检查失败: {e}")
-        return False
+    return raid_cooldown.ready(SITE_NAME, "raiding")